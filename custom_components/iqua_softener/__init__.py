@@ -1,12 +1,16 @@
 """iQua Water Softener integration with hub support."""
+import asyncio
+from datetime import timedelta
 import logging
 
 from homeassistant import config_entries, core
 from homeassistant.const import Platform
-from homeassistant.exceptions import ConfigEntryNotReady
-from homeassistant.helpers import device_registry as dr
-
-from iqua_softener import IquaSoftener, IquaSoftenerException
+from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
+from homeassistant.helpers import (
+    config_validation as cv,
+    device_registry as dr,
+    entity_registry as er,
+)
 
 from .const import (
     DOMAIN,
@@ -15,12 +19,41 @@ from .const import (
     CONF_DEVICE_SERIAL_NUMBER,
     CONF_IS_HUB,
     CONF_HUB_ID,
+    CONF_STALE_WINDOW,
+    CONF_SALT_LOW_THRESHOLD,
+    CONF_OUT_OF_SALT_DAYS_THRESHOLD,
+    CONF_LEAK_DURATION,
+    CONF_SCAN_INTERVAL,
+    CONF_SUMMARY_MODE,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_STALE_WINDOW,
+    DEFAULT_SALT_LOW_THRESHOLD,
+    DEFAULT_OUT_OF_SALT_DAYS_THRESHOLD,
+    DEFAULT_LEAK_DURATION,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_SUMMARY_MODE,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
 )
-from .coordinator import IquaSoftenerCoordinator
-from .hub import IquaHub
+from .auth_store import async_get_token_store
 
 _LOGGER = logging.getLogger(__name__)
 
+PLATFORMS = [Platform.SENSOR, Platform.BINARY_SENSOR]
+HUB_PLATFORMS = [Platform.SENSOR]
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+# How long a device entry waits for its hub entry to load (seconds)
+HUB_READY_TIMEOUT = 60
+
+
+async def async_setup(hass: core.HomeAssistant, config: dict) -> bool:
+    """Set up the iQua Softener services."""
+    from .services import async_setup_services
+
+    async_setup_services(hass)
+    return True
+
 
 async def async_setup_entry(
     hass: core.HomeAssistant, entry: config_entries.ConfigEntry
@@ -47,22 +80,58 @@ async def async_setup_hub(
     config: dict,
 ) -> bool:
     """Set up hub (EcoWater account)."""
+    # Imported here so loading the package (e.g. for the config flow) does
+    # not pull in iqua_softener and the runtime modules
+    from iqua_softener import IquaSoftenerException
+
+    from .api import IquaAuthError
+    from .clients import async_get_client_registry
+    from .hub import IquaHub, async_get_hub_ready_event, async_pop_validated_hub
     
-    # Create hub
-    hub = IquaHub(
-        hass,
-        config[CONF_USERNAME],
-        config[CONF_PASSWORD],
-    )
+    # Reuse the hub the config flow just authenticated, if any
+    hub = async_pop_validated_hub(hass, config[CONF_USERNAME])
+    clients = async_get_client_registry(hass)
     
-    # Setup and verify credentials (also discovers devices)
-    try:
-        await hub.async_setup()
-    except IquaSoftenerException as err:
-        raise ConfigEntryNotReady(f"Unable to connect to hub: {err}") from err
-    except Exception as err:
-        _LOGGER.exception("Unexpected error during hub setup")
-        raise ConfigEntryNotReady(f"Unexpected error: {err}") from err
+    if hub is None:
+        # Create hub, reusing the account client kept across reloads
+        hub = IquaHub(
+            hass,
+            config[CONF_USERNAME],
+            config[CONF_PASSWORD],
+            await clients.async_get_client(
+                config[CONF_USERNAME], config[CONF_PASSWORD]
+            ),
+        )
+        
+        # Setup and verify credentials (also discovers devices)
+        try:
+            await hub.async_setup()
+        except IquaAuthError as err:
+            raise ConfigEntryAuthFailed(str(err)) from err
+        except IquaSoftenerException as err:
+            raise ConfigEntryNotReady(f"Unable to connect to hub: {err}") from err
+        except Exception as err:
+            _LOGGER.exception("Unexpected error during hub setup")
+            raise ConfigEntryNotReady(f"Unexpected error: {err}") from err
+    else:
+        # Register the client (and token) the config flow signed in with; an
+        # account client kept across reloads takes them over instead
+        hub.client = await clients.async_get_client(
+            config[CONF_USERNAME], config[CONF_PASSWORD], hub.client
+        )
+
+    # Fetch all devices in one concurrent round so device entries start warm
+    await hub.async_prefetch(timedelta(minutes=DEFAULT_SCAN_INTERVAL))
+
+    # Register the account so devices can link to it and fleet sensors attach
+    dr.async_get(hass).async_get_or_create(
+        config_entry_id=entry.entry_id,
+        identifiers={(DOMAIN, entry.entry_id)},
+        manufacturer="EcoWater Systems",
+        model="EcoWater Account",
+        name=entry.title,
+        entry_type=dr.DeviceEntryType.SERVICE,
+    )
 
     # Store hub in hass.data
     hass.data.setdefault(DOMAIN, {})
@@ -71,6 +140,13 @@ async def async_setup_hub(
         "devices": {},
         "unsub": entry.add_update_listener(options_update_listener),
     }
+
+    await hass.config_entries.async_forward_entry_setups(entry, HUB_PLATFORMS)
+    
+    _async_update_worker_pool_limit(hass)
+    
+    # Release device entries waiting for this hub
+    async_get_hub_ready_event(hass, entry.entry_id).set()
     
     _LOGGER.info(
         "Hub setup complete for account %s, discovered %d device(s)",
@@ -94,7 +170,7 @@ async def async_setup_hub(
         _LOGGER.info(
             "Auto-adding device: %s (%s)",
             device_serial,
-            device_info.get('model', 'Unknown'),
+            device_info.model or 'Unknown',
         )
         
         hass.async_create_task(
@@ -105,7 +181,7 @@ async def async_setup_hub(
                     CONF_IS_HUB: False,
                     CONF_HUB_ID: entry.entry_id,
                     CONF_DEVICE_SERIAL_NUMBER: device_serial,
-                    "device_info": device_info,
+                    "device_info": device_info.as_dict(),
                 },
             )
         )
@@ -119,68 +195,117 @@ async def async_setup_device(
     config: dict,
 ) -> bool:
     """Set up device (water softener)."""
+    from iqua_softener import IquaSoftenerException
+
+    from .clients import async_get_client_registry
+    from .coordinator import IquaSoftenerCoordinator
+    from .hub import async_get_hub_ready_event, async_pop_validated_hub
     
     # Get hub reference if device is linked to hub
     hub_id = config.get(CONF_HUB_ID)
     hub = None
     
     if hub_id:
-        # Device is linked to a hub - check if hub is loaded
+        # Device is linked to a hub - wait for it if it is still loading
+        # (entries load concurrently on HA restart)
+        hub_entry = hass.config_entries.async_get_entry(hub_id)
+        if (
+            hub_entry
+            and not hub_entry.disabled_by
+            and hub_id not in hass.data.get(DOMAIN, {})
+        ):
+            _LOGGER.debug(
+                "Hub %s not yet loaded, waiting before setting up %s",
+                hub_id,
+                config.get(CONF_DEVICE_SERIAL_NUMBER),
+            )
+            try:
+                await asyncio.wait_for(
+                    async_get_hub_ready_event(hass, hub_id).wait(),
+                    HUB_READY_TIMEOUT,
+                )
+            except asyncio.TimeoutError as err:
+                raise ConfigEntryNotReady(
+                    f"Timed out waiting for hub {hub_id} to load"
+                ) from err
+        
         if hub_id in hass.data.get(DOMAIN, {}):
             hub = hass.data[DOMAIN][hub_id]["hub"]
             _LOGGER.debug("Device linked to hub %s", hub_id)
+        elif hub_entry:
+            raise ConfigEntryNotReady(f"Hub {hub_id} is not loaded")
         else:
-            # Hub exists in config but not yet loaded (race condition on HA restart)
-            hub_entry = hass.config_entries.async_get_entry(hub_id)
-            if hub_entry:
-                _LOGGER.debug(
-                    "Hub %s not yet loaded, deferring device setup for %s",
-                    hub_id,
-                    config.get(CONF_DEVICE_SERIAL_NUMBER),
-                )
+            # Hub entry no longer exists - this device is orphaned
+            _LOGGER.warning(
+                "Hub %s no longer exists, device %s is orphaned",
+                hub_id,
+                config.get(CONF_DEVICE_SERIAL_NUMBER),
+            )
+            # Fall through to standalone mode if credentials exist
+            if CONF_USERNAME not in config:
                 raise ConfigEntryNotReady(
-                    f"Waiting for hub {hub_id} to load first"
-                )
-            else:
-                # Hub entry no longer exists - this device is orphaned
-                _LOGGER.warning(
-                    "Hub %s no longer exists, device %s is orphaned",
-                    hub_id,
-                    config.get(CONF_DEVICE_SERIAL_NUMBER),
+                    f"Hub {hub_id} not found and no standalone credentials"
                 )
-                # Fall through to standalone mode if credentials exist
-                if CONF_USERNAME not in config:
-                    raise ConfigEntryNotReady(
-                        f"Hub {hub_id} not found and no standalone credentials"
-                    )
     
     # Create coordinator
+    clients = async_get_client_registry(hass)
+    credentials = None
     if hub:
-        # Device is part of hub - use hub credentials
-        softener = hub.get_softener_for_device(config[CONF_DEVICE_SERIAL_NUMBER])
-        coordinator = IquaSoftenerCoordinator(hass, softener)
+        # Device is part of hub - share the hub's account client
+        client = hub.client
     else:
-        # Standalone device (legacy mode)
-        coordinator = IquaSoftenerCoordinator(
-            hass,
-            IquaSoftener(
-                config[CONF_USERNAME],
-                config[CONF_PASSWORD],
-                config[CONF_DEVICE_SERIAL_NUMBER],
-            ),
+        # Standalone device (legacy mode) - reuse the account client kept
+        # across reloads, or the one from config flow validation
+        validated_hub = async_pop_validated_hub(hass, config[CONF_USERNAME])
+        client = await clients.async_get_client(
+            config[CONF_USERNAME],
+            config[CONF_PASSWORD],
+            validated_hub.client if validated_hub is not None else None,
         )
+        # The client is shared with other entries of the account, so new
+        # credentials are detected against the ones this entry applied
+        credentials = (config[CONF_USERNAME], config[CONF_PASSWORD])
+    
+    coordinator = IquaSoftenerCoordinator(
+        hass,
+        client,
+        config[CONF_DEVICE_SERIAL_NUMBER],
+        hub_entry_id=hub_id if hub else None,
+        **_coordinator_options(config),
+    )
+
+    # Restore usage totals and the salt fit before the first reading is folded in
+    await coordinator.aggregates.async_load()
+    await coordinator.salt_forecast.async_load()
 
-    # Validate connection BEFORE forwarding to platforms
-    try:
-        await coordinator.async_config_entry_first_refresh()
-    except IquaSoftenerException as err:
-        raise ConfigEntryNotReady(f"Unable to connect: {err}") from err
-    except Exception as err:
-        _LOGGER.exception("Unexpected error during device setup")
-        raise ConfigEntryNotReady(f"Unexpected error: {err}") from err
+    # Start from data the hub prefetched, or fetched before a reload
+    prefetched = hub.pop_prefetched(config[CONF_DEVICE_SERIAL_NUMBER]) if hub else None
+    cached = clients.async_get_snapshot(
+        client.username, config[CONF_DEVICE_SERIAL_NUMBER], coordinator.update_interval
+    )
+    
+    if prefetched is not None:
+        coordinator.async_set_updated_data(prefetched)
+    elif cached is not None:
+        fetched_at, snapshot = cached
+        coordinator.async_restore_data(snapshot, fetched_at)
+    else:
+        # Validate connection BEFORE forwarding to platforms
+        try:
+            await coordinator.async_config_entry_first_refresh()
+        except ConfigEntryAuthFailed:
+            raise
+        except IquaSoftenerException as err:
+            raise ConfigEntryNotReady(f"Unable to connect: {err}") from err
+        except Exception as err:
+            _LOGGER.exception("Unexpected error during device setup")
+            raise ConfigEntryNotReady(f"Unexpected error: {err}") from err
 
     # Get device data for better device info
     device_data = coordinator.data
+    
+    # Prefer account listing metadata (/system) when linked to a hub
+    listing = hub.devices.get(config[CONF_DEVICE_SERIAL_NUMBER]) if hub else None
 
     # Register device in device registry
     device_registry = dr.async_get(hass)
@@ -188,9 +313,10 @@ async def async_setup_device(
         config_entry_id=entry.entry_id,
         identifiers={(DOMAIN, config[CONF_DEVICE_SERIAL_NUMBER])},
         manufacturer="EcoWater Systems",
-        model=getattr(device_data, 'model', "iQua Water Softener"),
-        name=entry.title or f"Water Softener {config[CONF_DEVICE_SERIAL_NUMBER][-6:]}",
-        sw_version=getattr(device_data, 'firmware_version', None),
+        model=(listing and listing.model) or device_data.model,
+        name=entry.title
+        or (listing and listing.nickname)
+        or f"Water Softener {config[CONF_DEVICE_SERIAL_NUMBER][-6:]}",
         suggested_area="Basement",
         via_device=(DOMAIN, hub_id) if hub_id else None,  # Link to hub
     )
@@ -201,6 +327,8 @@ async def async_setup_device(
         "coordinator": coordinator,
         "device_id": device_entry.id,
         "hub_id": hub_id,
+        "credentials": credentials,
+        "summary_mode": config.get(CONF_SUMMARY_MODE, DEFAULT_SUMMARY_MODE),
         "unsub": entry.add_update_listener(options_update_listener),
     }
     
@@ -208,8 +336,32 @@ async def async_setup_device(
     if hub_id and hub_id in hass.data[DOMAIN]:
         hass.data[DOMAIN][hub_id]["devices"][entry.entry_id] = coordinator
 
+    if hub:
+        # Feed the hub's fleet aggregates as this device's data arrives
+        device_serial = config[CONF_DEVICE_SERIAL_NUMBER]
+
+        @core.callback
+        def _async_update_fleet() -> None:
+            if coordinator.data is not None:
+                hub.fleet.async_update_device(
+                    device_serial,
+                    coordinator.data,
+                    coordinator.events.salt_low_threshold,
+                    coordinator.events.out_of_salt_days_threshold,
+                )
+
+        _async_update_fleet()
+        remove_listener = coordinator.async_add_listener(_async_update_fleet)
+
+        @core.callback
+        def _async_leave_fleet() -> None:
+            remove_listener()
+            hub.fleet.async_remove_device(device_serial)
+
+        hass.data[DOMAIN][entry.entry_id]["leave_fleet"] = _async_leave_fleet
+
     # Now safe to forward to platforms
-    await hass.config_entries.async_forward_entry_setups(entry, [Platform.SENSOR])
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     
     _LOGGER.info(
         "Device setup complete for %s%s",
@@ -220,11 +372,121 @@ async def async_setup_device(
     return True
 
 
+def _coordinator_options(config: dict) -> dict:
+    """Return coordinator settings from entry data and options."""
+    return {
+        "update_interval": timedelta(
+            minutes=config.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+        ),
+        "stale_window": timedelta(
+            minutes=config.get(CONF_STALE_WINDOW, DEFAULT_STALE_WINDOW)
+        ),
+        "salt_low_threshold": config.get(
+            CONF_SALT_LOW_THRESHOLD, DEFAULT_SALT_LOW_THRESHOLD
+        ),
+        "out_of_salt_days_threshold": config.get(
+            CONF_OUT_OF_SALT_DAYS_THRESHOLD, DEFAULT_OUT_OF_SALT_DAYS_THRESHOLD
+        ),
+        "leak_duration": timedelta(
+            hours=config.get(CONF_LEAK_DURATION, DEFAULT_LEAK_DURATION)
+        ),
+    }
+
+
+async def async_reload_entry(
+    hass: core.HomeAssistant, entry: config_entries.ConfigEntry
+) -> None:
+    """Reload an entry; a hub brings its devices back up after it."""
+    await hass.config_entries.async_reload(entry.entry_id)
+    if entry.data.get(CONF_IS_HUB, False):
+        await asyncio.gather(
+            *(
+                hass.config_entries.async_reload(device_entry.entry_id)
+                for device_entry in hass.config_entries.async_entries(DOMAIN)
+                if device_entry.data.get(CONF_HUB_ID) == entry.entry_id
+                and not device_entry.disabled_by
+            )
+        )
+
+
 async def options_update_listener(
     hass: core.HomeAssistant, config_entry: config_entries.ConfigEntry
 ):
-    """Handle options update."""
-    await hass.config_entries.async_reload(config_entry.entry_id)
+    """
+    Handle entry updates.
+
+    Option changes are applied to the running hub or coordinator; only new
+    credentials and a summary mode switch (which changes the entity set)
+    need a reload.
+    """
+    entry_data = hass.data.get(DOMAIN, {}).get(config_entry.entry_id)
+    if entry_data is None:
+        return
+
+    config = dict(config_entry.data)
+    config.update(config_entry.options)
+
+    if config.get(CONF_IS_HUB, False):
+        hub = entry_data["hub"]
+        if (hub.username, hub.password) != (
+            config[CONF_USERNAME],
+            config[CONF_PASSWORD],
+        ):
+            await async_reload_entry(hass, config_entry)
+            return
+        _async_update_worker_pool_limit(hass)
+        return
+
+    coordinator = entry_data["coordinator"]
+    credentials = entry_data["credentials"]
+    if credentials is not None and credentials != (
+        config[CONF_USERNAME],
+        config[CONF_PASSWORD],
+    ):
+        await async_reload_entry(hass, config_entry)
+        return
+
+    summary_mode = config.get(CONF_SUMMARY_MODE, DEFAULT_SUMMARY_MODE)
+    if entry_data["summary_mode"] != summary_mode:
+        _async_apply_summary_mode(hass, config_entry, summary_mode)
+        await async_reload_entry(hass, config_entry)
+        return
+
+    coordinator.async_apply_options(**_coordinator_options(config))
+    _LOGGER.debug("Applied options to device %s", coordinator.device_serial)
+
+
+@core.callback
+def _async_apply_summary_mode(
+    hass: core.HomeAssistant,
+    config_entry: config_entries.ConfigEntry,
+    summary_mode: bool,
+) -> None:
+    """
+    Update the registered sensors for a summary mode switch.
+
+    Turning summary mode on disables the per-metric sensors the user has
+    not disabled themselves; turning it off enables those again and
+    removes the summary sensor.
+    """
+    ent_reg = er.async_get(hass)
+    serial = config_entry.data[CONF_DEVICE_SERIAL_NUMBER]
+    summary_unique_id = f"{serial}_summary".lower()
+    for entity in er.async_entries_for_config_entry(ent_reg, config_entry.entry_id):
+        if entity.domain != Platform.SENSOR:
+            continue
+        if entity.unique_id == summary_unique_id:
+            if not summary_mode:
+                ent_reg.async_remove(entity.entity_id)
+        elif summary_mode and entity.disabled_by is None:
+            ent_reg.async_update_entity(
+                entity.entity_id, disabled_by=er.RegistryEntryDisabler.INTEGRATION
+            )
+        elif (
+            not summary_mode
+            and entity.disabled_by is er.RegistryEntryDisabler.INTEGRATION
+        ):
+            ent_reg.async_update_entity(entity.entity_id, disabled_by=None)
 
 
 async def async_unload_entry(
@@ -240,25 +502,54 @@ async def async_unload_entry(
         if entry.entry_id in hass.data.get(DOMAIN, {}):
             hub_data = hass.data[DOMAIN][entry.entry_id]
             
-            # Unload all linked devices
-            for device_entry_id in list(hub_data.get("devices", {}).keys()):
-                await hass.config_entries.async_unload(device_entry_id)
+            # Unload all linked devices at once, so the time taken does
+            # not grow with the number of devices
+            device_entry_ids = list(hub_data.get("devices", {}))
+            results = await asyncio.gather(
+                *(
+                    hass.config_entries.async_unload(device_entry_id)
+                    for device_entry_id in device_entry_ids
+                ),
+                return_exceptions=True,
+            )
+            for device_entry_id, result in zip(device_entry_ids, results):
+                if isinstance(result, Exception):
+                    _LOGGER.warning(
+                        "Failed to unload device entry %s: %s", device_entry_id, result
+                    )
             
-            # Cleanup hub
+            await hass.config_entries.async_unload_platforms(entry, HUB_PLATFORMS)
+
+            # Cleanup hub; the account client stays in the client registry
+            from .hub import async_get_hub_ready_event
+
+            async_get_hub_ready_event(hass, entry.entry_id).clear()
+            hub_data["hub"].async_clear_prefetched()
             hub_data["unsub"]()
             hass.data[DOMAIN].pop(entry.entry_id)
+            _async_update_worker_pool_limit(hass)
         
+        await _async_close_client_if_disabled(hass, entry)
+        _async_shutdown_worker_pool_if_idle(hass)
         return True
     else:
-        # Unloading device
+        # Unloading device - stop polling and cancel a refresh in flight first
+        device_data = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+        if device_data is not None:
+            await device_data["coordinator"].async_shutdown()
+        
         unload_ok = await hass.config_entries.async_unload_platforms(
-            entry, [Platform.SENSOR]
+            entry, PLATFORMS
         )
 
         # Always cleanup, even if unload failed
         if entry.entry_id in hass.data.get(DOMAIN, {}):
             device_data = hass.data[DOMAIN][entry.entry_id]
             device_data["unsub"]()
+            if "leave_fleet" in device_data:
+                device_data["leave_fleet"]()
+            await device_data["coordinator"].aggregates.async_save()
+            await device_data["coordinator"].salt_forecast.async_save()
             
             # Remove from hub's device list if applicable
             hub_id = device_data.get("hub_id")
@@ -268,4 +559,97 @@ async def async_unload_entry(
             if unload_ok:
                 hass.data[DOMAIN].pop(entry.entry_id)
 
+        await _async_close_client_if_disabled(hass, entry)
+        _async_shutdown_worker_pool_if_idle(hass)
         return unload_ok
+
+
+async def async_remove_entry(
+    hass: core.HomeAssistant, entry: config_entries.ConfigEntry
+) -> None:
+    """Delete data stored for a removed entry."""
+    from .aggregates import IquaUsageAggregator
+    from .clients import async_get_client_registry
+    from .forecast import IquaSaltForecaster
+    from .history import IquaHistoryLog
+
+    username = entry.data.get(CONF_USERNAME)
+    if username is not None and not any(
+        other.data.get(CONF_USERNAME, "").lower() == username.lower()
+        for other in hass.config_entries.async_entries(DOMAIN)
+        if other.entry_id != entry.entry_id
+    ):
+        # Last entry of the account - forget its saved token and client
+        await async_get_token_store(hass).async_remove(username)
+        await async_get_client_registry(hass).async_evict(username)
+
+    if entry.data.get(CONF_IS_HUB, False):
+        return
+
+    device_serial = entry.data[CONF_DEVICE_SERIAL_NUMBER]
+    async_get_client_registry(hass).async_evict_device(device_serial)
+    await IquaUsageAggregator(hass, device_serial).async_remove()
+    await IquaSaltForecaster(hass, device_serial).async_remove()
+    await hass.async_add_executor_job(IquaHistoryLog(hass, device_serial).remove)
+
+
+async def _async_close_client_if_disabled(
+    hass: core.HomeAssistant, entry: config_entries.ConfigEntry
+) -> None:
+    """
+    Close the account client of a disabled entry.
+
+    Clients otherwise stay open across unloads for a fast reload, which a
+    disabled entry will not do. Kept open while another loaded entry uses
+    the account.
+    """
+    username = entry.data.get(CONF_USERNAME)
+    if entry.disabled_by is None or username is None:
+        return
+    domain_data = hass.data.get(DOMAIN, {})
+    if any(
+        other.entry_id in domain_data
+        and other.data.get(CONF_USERNAME, "").lower() == username.lower()
+        for other in hass.config_entries.async_entries(DOMAIN)
+        if other.entry_id != entry.entry_id
+    ):
+        return
+    from .clients import async_get_client_registry
+
+    await async_get_client_registry(hass).async_close(username)
+
+
+@core.callback
+def _async_update_worker_pool_limit(hass: core.HomeAssistant) -> None:
+    """
+    Size the worker pool for the loaded hubs.
+
+    The pool is shared by all accounts, so it runs as many requests at once
+    as the highest limit of any loaded hub, or the default without hubs.
+    """
+    from .worker_pool import async_get_worker_pool
+
+    domain_data = hass.data.get(DOMAIN, {})
+    limits = [
+        entry.options.get(
+            CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS
+        )
+        for entry in hass.config_entries.async_entries(DOMAIN)
+        if entry.data.get(CONF_IS_HUB, False) and entry.entry_id in domain_data
+    ]
+    async_get_worker_pool(hass).async_set_limit(
+        max(limits, default=DEFAULT_MAX_CONCURRENT_REQUESTS)
+    )
+
+
+@core.callback
+def _async_shutdown_worker_pool_if_idle(hass: core.HomeAssistant) -> None:
+    """Shut the worker pool down once no entry of the integration is loaded."""
+    from .worker_pool import async_shutdown_worker_pool
+
+    domain_data = hass.data.get(DOMAIN, {})
+    if not any(
+        entry.entry_id in domain_data
+        for entry in hass.config_entries.async_entries(DOMAIN)
+    ):
+        async_shutdown_worker_pool(hass)
@@ -0,0 +1,199 @@
+"""Incremental water consumption aggregates for iQua Softener."""
+from dataclasses import dataclass
+from datetime import date, timedelta
+import logging
+from typing import Any, Dict, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, VOLUME_UNIT_LITERS
+from .models import IquaDeviceSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+# Delay before writing aggregates to disk after a change (seconds)
+SAVE_DELAY = 60
+
+LITERS_PER_GALLON = 3.785411784
+
+
+def _period_start(period: str, day: date) -> date:
+    """Return the first day of the period containing `day`."""
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    return day
+
+
+@dataclass(slots=True)
+class IquaPeriodTotals:
+    """Running total of the current period and averages over completed ones."""
+
+    start: date
+    total: float = 0.0
+    completed: int = 0
+    completed_total: float = 0.0
+    previous_total: Optional[float] = None
+    # Some days of the period were not recorded (e.g. Home Assistant was down)
+    partial: bool = False
+
+    @property
+    def average(self) -> Optional[float]:
+        """Return the mean total of completed periods."""
+        if not self.completed:
+            return None
+        return self.completed_total / self.completed
+
+    def roll(self, start: date, previous_start: date, recorded_to_end: bool) -> None:
+        """
+        Close the current period and start a new one.
+
+        Only periods recorded from their first to their last day count
+        towards the average. The closed total is only the previous total
+        if no period was skipped in between.
+        """
+        if recorded_to_end and not self.partial:
+            self.completed += 1
+            self.completed_total += self.total
+        self.previous_total = self.total if previous_start == self.start else None
+        self.start = start
+        self.total = 0.0
+        self.partial = False
+
+    def as_list(self) -> list:
+        """Return a compact representation for storage."""
+        return [
+            self.start.isoformat(),
+            self.total,
+            self.completed,
+            self.completed_total,
+            self.previous_total,
+            self.partial,
+        ]
+
+    @classmethod
+    def from_list(cls, data: list) -> "IquaPeriodTotals":
+        """Restore totals stored by as_list()."""
+        start, total, completed, completed_total, previous_total, partial = data
+        return cls(
+            date.fromisoformat(start),
+            total,
+            completed,
+            completed_total,
+            previous_total,
+            partial,
+        )
+
+
+class IquaUsageAggregator:
+    """
+    Daily, weekly and monthly usage totals folded in on every poll.
+
+    Totals are kept in liters so a change of the device's volume unit does
+    not mix units. The device resets today's usage at its midnight; a lower
+    reading than the previous one counts as usage since that reset.
+    """
+
+    PERIODS = ("day", "week", "month")
+
+    def __init__(self, hass: HomeAssistant, device_serial: str) -> None:
+        """Initialize the aggregator."""
+        self._store: Store = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.aggregates.{device_serial}"
+        )
+        self.periods: Dict[str, IquaPeriodTotals] = {}
+        self._last_day: Optional[date] = None
+        self._last_liters: Optional[float] = None
+        self._last_unit: Optional[int] = None
+
+    async def async_load(self) -> None:
+        """Restore totals saved before the last restart."""
+        data = await self._store.async_load()
+        if not data:
+            return
+        try:
+            self._last_day = date.fromisoformat(data["day"])
+            self._last_liters = data["today_liters"]
+            self._last_unit = data["unit"]
+            self.periods = {
+                period: IquaPeriodTotals.from_list(totals)
+                for period, totals in data["periods"].items()
+            }
+        except (KeyError, TypeError, ValueError) as err:
+            _LOGGER.warning("Discarding unreadable usage aggregates: %s", err)
+            self.periods = {}
+            self._last_day = None
+            self._last_liters = None
+            self._last_unit = None
+
+    @callback
+    def async_process(self, snapshot: IquaDeviceSnapshot) -> None:
+        """Fold today's usage reading into the period totals."""
+        day = snapshot.device_date_time.date()
+        liters = snapshot.today_use * (
+            1 if snapshot.volume_unit == VOLUME_UNIT_LITERS else LITERS_PER_GALLON
+        )
+
+        if self._last_liters is None or self._last_day is None:
+            # First reading ever: today's usage so far belongs to today
+            delta = liters
+        elif snapshot.volume_unit != self._last_unit and day == self._last_day:
+            # Unit switched mid-day: the converted counter is not a reset,
+            # but rounding may make it slightly lower
+            delta = max(liters - self._last_liters, 0.0)
+        elif day != self._last_day or liters < self._last_liters:
+            # New device day: the counter restarted at midnight
+            delta = liters
+        else:
+            delta = liters - self._last_liters
+
+        # Days between the previous reading and this one were not recorded
+        missed = self._last_day is not None and day - self._last_day > timedelta(days=1)
+        for period in self.PERIODS:
+            start = _period_start(period, day)
+            totals = self.periods.get(period)
+            if totals is None:
+                # Tracking started during the period
+                totals = self.periods[period] = IquaPeriodTotals(
+                    start, partial=day != start
+                )
+            elif start > totals.start:
+                day_before = start - timedelta(days=1)
+                totals.roll(
+                    start,
+                    _period_start(period, day_before),
+                    recorded_to_end=self._last_day == day_before,
+                )
+                totals.partial = day != start
+            elif missed:
+                totals.partial = True
+            totals.total += delta
+
+        self._last_day = day
+        self._last_liters = liters
+        self._last_unit = snapshot.volume_unit
+        if delta:
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def _data_to_save(self) -> Dict[str, Any]:
+        """Return the compact form written to storage."""
+        return {
+            "day": self._last_day.isoformat() if self._last_day else None,
+            "today_liters": self._last_liters,
+            "unit": self._last_unit,
+            "periods": {
+                period: totals.as_list() for period, totals in self.periods.items()
+            },
+        }
+
+    async def async_save(self) -> None:
+        """Write pending totals now, e.g. before the entry reloads."""
+        if self._last_day is not None:
+            await self._store.async_save(self._data_to_save())
+
+    async def async_remove(self) -> None:
+        """Delete the stored aggregates."""
+        await self._store.async_remove()
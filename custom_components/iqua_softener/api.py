@@ -0,0 +1,298 @@
+"""EcoWater cloud API client for iQua Softener."""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+from homeassistant.util.json import json_loads
+
+from iqua_softener import IquaSoftenerException
+
+from .models import IquaDeviceRecord, IquaDeviceSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+API_BASE_URL = "https://apioem.ecowater.com/v1"
+USER_AGENT = "okhttp/3.12.1"
+
+# Request timeouts (seconds)
+REQUEST_TIMEOUT = 30
+VALIDATION_TIMEOUT = 10
+
+
+class IquaAuthError(IquaSoftenerException):
+    """The account credentials were rejected."""
+
+
+def _decode_response(response: requests.Response, invalid: str, failed: str):
+    """Decode an API response with orjson and return its `data` member."""
+    try:
+        payload = json_loads(response.content)
+    except ValueError:
+        raise IquaSoftenerException(invalid)
+
+    if not isinstance(payload, dict):
+        raise IquaSoftenerException(invalid)
+    if payload.get("code") != "OK":
+        raise IquaSoftenerException(f"{failed}: {payload.get('message')}")
+    return payload.get("data")
+
+
+class IquaApiClient:
+    """Blocking client for one EcoWater account that keeps its session and token."""
+
+    def __init__(
+        self, username: str, password: str, timeout: float = REQUEST_TIMEOUT
+    ) -> None:
+        """Initialize the client."""
+        self._username = username
+        self._password = password
+        self.timeout = timeout
+        self._session: Optional[requests.Session] = None
+        self._token: Optional[str] = None
+        self._token_type: Optional[str] = None
+        self._token_expiration_timestamp: Optional[datetime] = None
+        # Devices of one account are polled from several worker threads
+        self._token_lock = threading.Lock()
+        # Called from the signing-in thread whenever a new token is stored
+        self.on_token_changed: Optional[Callable[[], None]] = None
+        # Set once the credentials are rejected; no request is sent afterwards
+        self.auth_failed = False
+
+    @property
+    def username(self) -> str:
+        """Return the account username."""
+        return self._username
+
+    @property
+    def password(self) -> str:
+        """Return the account password."""
+        return self._password
+
+    @property
+    def has_valid_token(self) -> bool:
+        """Return True if a non-expired token is held."""
+        return self._token is not None and (
+            self._token_expiration_timestamp is None
+            or datetime.now() < self._token_expiration_timestamp
+        )
+
+    def export_token(self) -> Optional[Dict[str, Any]]:
+        """Return the held token and its expiry (epoch seconds) for persisting."""
+        if self._token is None:
+            return None
+        return {
+            "token": self._token,
+            "token_type": self._token_type,
+            "expires": self._token_expiration_timestamp.timestamp()
+            if self._token_expiration_timestamp
+            else None,
+        }
+
+    def restore_token(self, data: Dict[str, Any]) -> None:
+        """Use a token saved by export_token() until it expires or is rejected."""
+        with self._token_lock:
+            self._token = data["token"]
+            self._token_type = data["token_type"]
+            self._token_expiration_timestamp = (
+                datetime.fromtimestamp(data["expires"])
+                if data.get("expires") is not None
+                else None
+            )
+
+    def set_credentials(
+        self, password: str, token: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Switch to a new password, keeping the session.
+
+        The held token is dropped, or replaced by `token` (export_token() of
+        a client signed in with the new password), and requests are allowed
+        again after a rejection.
+        """
+        with self._token_lock:
+            self._password = password
+            self._token = None
+            self._token_type = None
+            self._token_expiration_timestamp = None
+            self.auth_failed = False
+        if token is not None:
+            self.restore_token(token)
+
+    def _get_session(self) -> requests.Session:
+        """Return the shared HTTP session."""
+        if self._session is None:
+            self._session = requests.Session()
+        return self._session
+
+    def _get_headers(self, with_authorization: bool = True) -> dict:
+        """Return request headers."""
+        headers = {"User-Agent": USER_AGENT, "Content-Type": "application/json"}
+        if with_authorization and self._token is not None:
+            headers["Authorization"] = f"{self._token_type} {self._token}"
+        return headers
+
+    def _request(
+        self,
+        method: str,
+        resource: str,
+        failed: str,
+        deadline: Optional[float] = None,
+        **kwargs,
+    ) -> requests.Response:
+        """
+        Send a request, mapping transport errors to IquaSoftenerException.
+
+        `deadline` is a time.monotonic() value; the request timeout is cut
+        down to what is left of it.
+        """
+        timeout = self.timeout
+        if deadline is not None:
+            timeout = min(timeout, deadline - time.monotonic())
+            if timeout <= 0:
+                raise IquaSoftenerException("Update deadline exceeded")
+        try:
+            return self._get_session().request(
+                method,
+                f"{API_BASE_URL}/{resource}",
+                timeout=timeout,
+                **kwargs,
+            )
+        except requests.exceptions.Timeout:
+            raise IquaSoftenerException("Connection timeout - server not responding")
+        except requests.exceptions.ConnectionError:
+            raise IquaSoftenerException("Cannot connect to EcoWater servers")
+        except requests.exceptions.RequestException as err:
+            raise IquaSoftenerException(f"{failed}: {err}")
+
+    def _authorized_get(
+        self, resource: str, failed: str, deadline: Optional[float] = None
+    ) -> requests.Response:
+        """GET a resource with the account token, signing in again once on 401."""
+        self._ensure_token(deadline)
+        token = self._token
+        response = self._request(
+            "GET", resource, failed, deadline, headers=self._get_headers()
+        )
+        if response.status_code == 401:
+            # Token rejected by server - sign in again once
+            self._renew_token(token, deadline)
+            response = self._request(
+                "GET", resource, failed, deadline, headers=self._get_headers()
+            )
+
+        if response.status_code == 502:
+            raise IquaSoftenerException("Server unavailable (502) - try again later")
+        if response.status_code != 200:
+            raise IquaSoftenerException(f"{failed}: HTTP {response.status_code}")
+        return response
+
+    def _ensure_token(self, deadline: Optional[float] = None) -> None:
+        """Sign in unless a valid token is held."""
+        if self.auth_failed:
+            raise IquaAuthError("Authentication failed - reauthentication required")
+        with self._token_lock:
+            if not self.has_valid_token:
+                self.signin(deadline)
+
+    def _renew_token(
+        self, rejected_token: Optional[str], deadline: Optional[float] = None
+    ) -> None:
+        """Sign in again unless another thread already replaced the rejected token."""
+        with self._token_lock:
+            if self._token == rejected_token:
+                self.signin(deadline)
+
+    def signin(self, deadline: Optional[float] = None) -> None:
+        """Authenticate and store the account token."""
+        auth_response = self._request(
+            "POST",
+            "auth/signin",
+            "Connection error",
+            deadline,
+            json={"username": self._username, "password": self._password},
+            headers=self._get_headers(with_authorization=False),
+        )
+
+        if auth_response.status_code == 401:
+            self.auth_failed = True
+            raise IquaAuthError("Authentication error: Invalid username or password")
+        if auth_response.status_code == 502:
+            raise IquaSoftenerException("Server unavailable (502) - try again later")
+        if auth_response.status_code != 200:
+            raise IquaSoftenerException(f"Authentication failed: HTTP {auth_response.status_code}")
+
+        try:
+            auth_data = _decode_response(
+                auth_response, "Invalid response from server", "Authentication failed"
+            )
+        except IquaSoftenerException as err:
+            # Unknown accounts are also rejected with an HTTP 200 response
+            if "invalid user" in str(err).lower():
+                self.auth_failed = True
+                raise IquaAuthError(str(err)) from err
+            raise
+
+        self._token = auth_data["token"]
+        self._token_type = auth_data["tokenType"]
+        expires_in = auth_data.get("expiresIn")
+        self._token_expiration_timestamp = (
+            datetime.now() + timedelta(seconds=int(expires_in))
+            if expires_in is not None
+            else None
+        )
+        if self.on_token_changed is not None:
+            self.on_token_changed()
+
+    def list_devices(self) -> List[IquaDeviceRecord]:
+        """Fetch the list of devices, signing in only when needed."""
+        devices_response = self._authorized_get("system", "Failed to fetch devices")
+
+        devices_data = _decode_response(
+            devices_response,
+            "Invalid response when fetching devices",
+            "Failed to fetch devices",
+        )
+
+        # Parse devices straight from the decoded payload
+        return [
+            IquaDeviceRecord(
+                serial=device.get('serialNumber'),
+                nickname=device.get('nickname', 'Device'),
+                model=device.get('modelDescription', 'Water Softener'),
+                model_id=device.get('modelName'),
+                system_type=device.get('systemType'),
+                product_image=device.get('productImage'),
+            )
+            for device in devices_data or ()
+        ]
+
+    def get_device_snapshot(
+        self,
+        device_serial: str,
+        deadline: Optional[float] = None,
+    ) -> IquaDeviceSnapshot:
+        """Fetch a device dashboard and parse it into a snapshot."""
+        response = self._authorized_get(
+            f"system/{device_serial}/dashboard", "Failed to fetch device data", deadline
+        )
+
+        data = _decode_response(
+            response,
+            "Invalid response when fetching device data",
+            "Failed to fetch device data",
+        )
+
+        try:
+            return IquaDeviceSnapshot.from_dashboard(data)
+        except (KeyError, TypeError, ValueError) as err:
+            raise IquaSoftenerException(f"Unexpected device data format: {err}")
+
+    def close(self) -> None:
+        """Close the HTTP session."""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
@@ -0,0 +1,153 @@
+"""Persistence of EcoWater account tokens across restarts."""
+import base64
+import hashlib
+import logging
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.json import json_dumps
+from homeassistant.helpers.storage import Store
+from homeassistant.util.json import json_loads
+
+from .const import DOMAIN, DATA_TOKEN_STORE
+
+if TYPE_CHECKING:
+    from .api import IquaApiClient
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.auth"
+# Delay before writing a new token to disk (seconds)
+SAVE_DELAY = 10
+
+# Key derivation cost for encrypting tokens with the account password
+KDF_ITERATIONS = 100_000
+
+
+def _derive_cipher(username: str, password: str) -> Optional[Any]:
+    """Return a Fernet cipher keyed by the account credentials, if available."""
+    try:
+        from cryptography.fernet import Fernet
+    except ImportError:
+        return None
+    key = hashlib.pbkdf2_hmac(
+        "sha256", password.encode(), username.lower().encode(), KDF_ITERATIONS
+    )
+    return Fernet(base64.urlsafe_b64encode(key))
+
+
+class IquaTokenStore:
+    """
+    Account tokens saved in Home Assistant's private storage.
+
+    Tokens are encrypted with a key derived from the account's username and
+    password when `cryptography` is available, so a changed password also
+    invalidates the saved token.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the store."""
+        self.hass = hass
+        self._store: Store = Store(hass, STORAGE_VERSION, STORAGE_KEY, private=True)
+        self._data: Optional[Dict[str, Dict[str, str]]] = None
+        self._ciphers: Dict[Tuple[str, str], Any] = {}
+
+    def _cipher(self, client: "IquaApiClient") -> Optional[Any]:
+        """Return the (cached) cipher for a client's account; blocking."""
+        key = (client.username.lower(), client.password)
+        if key not in self._ciphers:
+            self._ciphers[key] = _derive_cipher(client.username, client.password)
+        return self._ciphers[key]
+
+    def _encode(self, client: "IquaApiClient") -> Optional[Dict[str, str]]:
+        """Serialize and, where possible, encrypt a client's token; blocking."""
+        token = client.export_token()
+        if token is None:
+            return None
+        payload = json_dumps(token)
+        cipher = self._cipher(client)
+        if cipher is None:
+            return {"plain": payload}
+        return {"encrypted": cipher.encrypt(payload.encode()).decode()}
+
+    def _decode(
+        self, client: "IquaApiClient", entry: Dict[str, str]
+    ) -> Optional[Dict[str, Any]]:
+        """Decrypt and parse a stored token; blocking."""
+        if "plain" in entry:
+            return json_loads(entry["plain"])
+        cipher = self._cipher(client)
+        if cipher is None:
+            return None
+        from cryptography.fernet import InvalidToken
+
+        try:
+            return json_loads(cipher.decrypt(entry["encrypted"].encode()))
+        except InvalidToken:
+            # Saved with other credentials
+            return None
+
+    async def _async_load(self) -> Dict[str, Dict[str, str]]:
+        """Load stored tokens once."""
+        if self._data is None:
+            self._data = await self._store.async_load() or {}
+        return self._data
+
+    async def async_attach(self, client: "IquaApiClient") -> bool:
+        """
+        Restore a client's saved token and persist the tokens it gets later.
+
+        Returns True if a still valid token was restored.
+        """
+        data = await self._async_load()
+        account = client.username.lower()
+        restored = False
+        if not client.has_valid_token and account in data:
+            token = await self.hass.async_add_executor_job(
+                self._decode, client, data[account]
+            )
+            if token and (token.get("expires") is None or token["expires"] > time.time()):
+                client.restore_token(token)
+                restored = True
+                _LOGGER.debug("Restored saved token for account %s", client.username)
+
+        def token_changed() -> None:
+            # Runs in the signing-in thread
+            entry = self._encode(client)
+            self.hass.loop.call_soon_threadsafe(self._async_set, account, entry)
+
+        client.on_token_changed = token_changed
+        if client.has_valid_token and not restored:
+            # Signed in before attaching, e.g. during config flow validation
+            await self.hass.async_add_executor_job(token_changed)
+        return restored
+
+    @callback
+    def _async_set(self, account: str, entry: Optional[Dict[str, str]]) -> None:
+        """Remember an account's token and schedule a write."""
+        if self._data is None:
+            return
+        if entry is None:
+            self._data.pop(account, None)
+        else:
+            self._data[account] = entry
+        self._store.async_delay_save(lambda: self._data, SAVE_DELAY)
+
+    async def async_remove(self, username: str) -> None:
+        """Forget an account's token."""
+        await self._async_load()
+        account = username.lower()
+        for key in [key for key in self._ciphers if key[0] == account]:
+            del self._ciphers[key]
+        self._async_set(account, None)
+
+
+@callback
+def async_get_token_store(hass: HomeAssistant) -> IquaTokenStore:
+    """Return the integration-wide token store."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_TOKEN_STORE not in domain_data:
+        domain_data[DATA_TOKEN_STORE] = IquaTokenStore(hass)
+    return domain_data[DATA_TOKEN_STORE]
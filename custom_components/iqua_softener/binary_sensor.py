@@ -0,0 +1,88 @@
+"""Binary sensor platform for iQua Softener."""
+import logging
+from typing import Any, Dict, Optional
+
+from homeassistant import config_entries, core
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+    BinarySensorEntityDescription,
+)
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN, CONF_DEVICE_SERIAL_NUMBER
+from .coordinator import IquaSoftenerCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(
+    hass: core.HomeAssistant,
+    config_entry: config_entries.ConfigEntry,
+    async_add_entities,
+):
+    """Set up iQua Softener binary sensors from a config entry."""
+    coordinator: IquaSoftenerCoordinator = hass.data[DOMAIN][config_entry.entry_id][
+        "coordinator"
+    ]
+    async_add_entities(
+        [
+            IquaSoftenerLeakSensor(
+                coordinator,
+                config_entry.data[CONF_DEVICE_SERIAL_NUMBER],
+                BinarySensorEntityDescription(
+                    key="leak_suspected",
+                    translation_key="leak_suspected",
+                    device_class=BinarySensorDeviceClass.PROBLEM,
+                ),
+            )
+        ]
+    )
+
+
+class IquaSoftenerLeakSensor(BinarySensorEntity, CoordinatorEntity):
+    """On while a low, steady flow has lasted for the leak duration."""
+
+    _attr_has_entity_name = True
+    _unrecorded_attributes = frozenset({"continuous_flow_minutes", "min_duration_minutes"})
+
+    def __init__(
+        self,
+        coordinator: IquaSoftenerCoordinator,
+        device_serial_number: str,
+        entity_description: BinarySensorEntityDescription,
+    ):
+        super().__init__(coordinator)
+        self.entity_description = entity_description
+        self._attr_unique_id = (
+            f"{device_serial_number}_{entity_description.key}".lower()
+        )
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, device_serial_number)},
+        }
+
+    @property
+    def available(self) -> bool:
+        """Return if entity is available, serving stale data within the window."""
+        if self.coordinator.data is None:
+            return False
+        return (
+            self.coordinator.last_update_success
+            or self.coordinator.within_stale_window
+        )
+
+    @property
+    def is_on(self) -> bool:
+        """Return True if a leak is suspected."""
+        return self.coordinator.leak.leak_suspected
+
+    @property
+    def extra_state_attributes(self) -> Optional[Dict[str, Any]]:
+        """Return the current flow run and the configured sensitivity."""
+        leak = self.coordinator.leak
+        return {
+            "continuous_flow_minutes": round(
+                leak.continuous_flow_duration.total_seconds() / 60
+            ),
+            "min_duration_minutes": round(leak.min_duration.total_seconds() / 60),
+        }
@@ -0,0 +1,160 @@
+"""Integration-wide registry of EcoWater account clients."""
+from datetime import datetime, timedelta
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .api import IquaApiClient
+from .auth_store import async_get_token_store
+from .const import DOMAIN, DATA_CLIENTS
+from .models import IquaDeviceRecord, IquaDeviceSnapshot
+from .worker_pool import async_get_worker_pool
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class IquaClientRegistry:
+    """
+    Account clients and their last results, kept across entry reloads.
+
+    A client holds one account's HTTP session and token and is shared by
+    the hub and every device of the account. Clients stay registered when
+    entries unload, together with the account's device listing and the
+    last snapshot per device, so a reload starts warm without signing in
+    or fetching again. Entries keep a reference to the client, so new
+    credentials are swapped into it in place instead of replacing it. A
+    client is closed when its account is removed or no longer in use, and
+    when Home Assistant stops.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the registry."""
+        self.hass = hass
+        self._clients: Dict[str, IquaApiClient] = {}
+        # Account -> (monotonic time listed, devices)
+        self._listings: Dict[str, Tuple[float, List[IquaDeviceRecord]]] = {}
+        # (account, serial) -> (time fetched, snapshot)
+        self._snapshots: Dict[Tuple[str, str], Tuple[datetime, IquaDeviceSnapshot]] = {}
+
+    async def async_get_client(
+        self,
+        username: str,
+        password: str,
+        client: Optional[IquaApiClient] = None,
+    ) -> IquaApiClient:
+        """
+        Return the account's client, registering a new one if needed.
+
+        `client` (e.g. one the config flow signed in with) is registered if
+        the account has no client yet; otherwise the registered client takes
+        over its password and token and `client` is closed.
+        """
+        account = username.lower()
+        existing = self._clients.get(account)
+        if existing is None:
+            if client is None:
+                client = IquaApiClient(username, password)
+            self._clients[account] = client
+        elif client is not None and client is not existing:
+            _LOGGER.debug("Taking over signed in client for account %s", username)
+            pool = async_get_worker_pool(self.hass)
+            await pool.async_run(
+                existing.set_credentials, client.password, client.export_token()
+            )
+            await pool.async_run(client.close)
+            client = existing
+        elif existing.password != password or existing.auth_failed:
+            _LOGGER.debug("Updating credentials for account %s", username)
+            await async_get_worker_pool(self.hass).async_run(
+                existing.set_credentials, password
+            )
+            client = existing
+        else:
+            _LOGGER.debug("Reusing client for account %s", username)
+            return existing
+
+        # Reuse the token saved before the restart, if still valid
+        await async_get_token_store(self.hass).async_attach(client)
+        return client
+
+    @callback
+    def async_get_listing(
+        self, username: str
+    ) -> Optional[Tuple[float, List[IquaDeviceRecord]]]:
+        """Return when the account's devices were last listed, and the list."""
+        return self._listings.get(username.lower())
+
+    @callback
+    def async_set_listing(self, username: str, devices: List[IquaDeviceRecord]) -> None:
+        """Remember the account's device list."""
+        self._listings[username.lower()] = (time.monotonic(), devices)
+
+    @callback
+    def async_get_snapshot(
+        self, username: str, device_serial: str, max_age: timedelta
+    ) -> Optional[Tuple[datetime, IquaDeviceSnapshot]]:
+        """Return a device's last snapshot and its time, if not older than max_age."""
+        cached = self._snapshots.get((username.lower(), device_serial))
+        if cached is None or dt_util.utcnow() - cached[0] >= max_age:
+            return None
+        return cached
+
+    @callback
+    def async_set_snapshot(
+        self,
+        username: str,
+        device_serial: str,
+        snapshot: IquaDeviceSnapshot,
+        fetched_at: datetime,
+    ) -> None:
+        """Remember a device's latest snapshot."""
+        self._snapshots[(username.lower(), device_serial)] = (fetched_at, snapshot)
+
+    @callback
+    def async_evict_device(self, device_serial: str) -> None:
+        """Forget a removed device's snapshot."""
+        for key in [key for key in self._snapshots if key[1] == device_serial]:
+            del self._snapshots[key]
+
+    async def async_close(self, username: str) -> None:
+        """Close and forget an account's client, keeping its results."""
+        client = self._clients.pop(username.lower(), None)
+        if client is not None:
+            _LOGGER.debug("Closing client for account %s", username)
+            await async_get_worker_pool(self.hass).async_run(client.close)
+
+    async def async_close_all(self) -> None:
+        """Close and forget every client."""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            await async_get_worker_pool(self.hass).async_run(client.close)
+
+    async def async_evict(self, username: str) -> None:
+        """Close and forget a removed account's client and results."""
+        account = username.lower()
+        self._listings.pop(account, None)
+        for key in [key for key in self._snapshots if key[0] == account]:
+            del self._snapshots[key]
+        client = self._clients.pop(account, None)
+        if client is not None:
+            _LOGGER.debug("Closing client for removed account %s", username)
+            await async_get_worker_pool(self.hass).async_run(client.close)
+
+
+@callback
+def async_get_client_registry(hass: HomeAssistant) -> IquaClientRegistry:
+    """Return the integration-wide client registry."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_CLIENTS not in domain_data:
+        registry = domain_data[DATA_CLIENTS] = IquaClientRegistry(hass)
+
+        async def _async_close_on_stop(event: Event) -> None:
+            await registry.async_close_all()
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_close_on_stop)
+    return domain_data[DATA_CLIENTS]
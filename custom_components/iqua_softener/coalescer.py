@@ -0,0 +1,78 @@
+"""Single-flight request coalescing for iQua Softener."""
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Tuple
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN, DATA_COALESCER
+from .worker_pool import async_get_worker_pool
+
+_LOGGER = logging.getLogger(__name__)
+
+# How long a successful result is served to later callers (seconds)
+RESULT_TTL = 15.0
+
+
+class IquaRequestCoalescer:
+    """Share one in-flight fetch per device between concurrent callers."""
+
+    def __init__(self, hass: HomeAssistant, ttl: float = RESULT_TTL) -> None:
+        """Initialize the coalescer."""
+        self.hass = hass
+        self._ttl = ttl
+        self._in_flight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._results: Dict[Tuple[str, str], Tuple[float, Any]] = {}
+
+    async def async_fetch(
+        self, account: str, device_serial: str, fetch: Callable[[], Any]
+    ) -> Any:
+        """
+        Return data for a device, joining an in-flight request if any.
+
+        `fetch` is a blocking callable run on the worker pool only when there is
+        neither a fresh cached result nor a request already in flight.
+        Failures are never cached, so the next caller retries.
+        """
+        key = (account.lower(), device_serial)
+
+        cached = self._results.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self._ttl:
+            _LOGGER.debug("Serving cached data for device %s", device_serial)
+            return cached[1]
+
+        future = self._in_flight.get(key)
+        if future is None:
+            future = self.hass.async_create_task(self._async_run(key, fetch))
+            self._in_flight[key] = future
+        else:
+            _LOGGER.debug("Joining in-flight request for device %s", device_serial)
+
+        # Shield so one cancelled caller does not cancel the shared request
+        return await asyncio.shield(future)
+
+    async def _async_run(
+        self, key: Tuple[str, str], fetch: Callable[[], Any]
+    ) -> Any:
+        """Run the fetch and remember a successful result."""
+        try:
+            result = await async_get_worker_pool(self.hass).async_run(fetch)
+        finally:
+            self._in_flight.pop(key, None)
+        self._results[key] = (time.monotonic(), result)
+        return result
+
+    @callback
+    def async_invalidate(self, account: str, device_serial: str) -> None:
+        """Drop the cached result for a device."""
+        self._results.pop((account.lower(), device_serial), None)
+
+
+@callback
+def async_get_coalescer(hass: HomeAssistant) -> IquaRequestCoalescer:
+    """Return the integration-wide request coalescer."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_COALESCER not in domain_data:
+        domain_data[DATA_COALESCER] = IquaRequestCoalescer(hass)
+    return domain_data[DATA_COALESCER]
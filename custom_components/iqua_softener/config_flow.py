@@ -1,13 +1,12 @@
 """Config flow for iQua Softener integration with hub support."""
 import logging
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional
 
 from homeassistant import config_entries, core
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 import voluptuous as vol
 
-from iqua_softener import IquaSoftener, IquaSoftenerException
-
 from .const import (
     DOMAIN,
     CONF_USERNAME,
@@ -15,8 +14,24 @@ from .const import (
     CONF_DEVICE_SERIAL_NUMBER,
     CONF_IS_HUB,
     CONF_HUB_ID,
+    CONF_STALE_WINDOW,
+    CONF_SALT_LOW_THRESHOLD,
+    CONF_OUT_OF_SALT_DAYS_THRESHOLD,
+    CONF_SUMMARY_MODE,
+    CONF_LEAK_DURATION,
+    CONF_SCAN_INTERVAL,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_STALE_WINDOW,
+    DEFAULT_SALT_LOW_THRESHOLD,
+    DEFAULT_OUT_OF_SALT_DAYS_THRESHOLD,
+    DEFAULT_SUMMARY_MODE,
+    DEFAULT_LEAK_DURATION,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
 )
-from .hub import IquaHub
+
+if TYPE_CHECKING:
+    from .hub import IquaHub
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -51,10 +66,19 @@ class IquaSoftenerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 2
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> config_entries.OptionsFlow:
+        """Get the options flow for this handler."""
+        return IquaSoftenerOptionsFlow(config_entry)
+
     def __init__(self):
         """Initialize config flow."""
         self._hub_data: Optional[Dict[str, Any]] = None
         self._discovered_devices: list = []
+        self._reauth_entry: Optional[config_entries.ConfigEntry] = None
 
     async def async_step_user(
         self, user_input: Optional[Dict[str, Any]] = None
@@ -71,20 +95,23 @@ class IquaSoftenerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self, user_input: Optional[Dict[str, Any]] = None
     ) -> FlowResult:
         """Handle hub setup (modern way)."""
+        # Imported here so loading the flow does not pull in iqua_softener
+        # and the runtime modules
+        from iqua_softener import IquaSoftenerException
+
+        from .api import IquaAuthError
+        from .hub import async_store_validated_hub
+
         errors: Dict[str, str] = {}
         
         if user_input is not None:
             # Validate credentials and discover devices
             try:
-                hub = IquaHub(
-                    self.hass,
+                hub = await self._async_validate_account(
                     user_input[CONF_USERNAME],
                     user_input[CONF_PASSWORD],
                 )
                 
-                # Setup hub (authenticates and discovers devices)
-                await hub.async_setup()
-                
                 # Store hub data and discovered devices
                 self._hub_data = {
                     CONF_IS_HUB: True,
@@ -96,26 +123,29 @@ class IquaSoftenerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 _LOGGER.info(
                     "Hub authenticated, found %d device(s): %s",
                     len(self._discovered_devices),
-                    [d.get('serial') for d in self._discovered_devices],
+                    [d.serial for d in self._discovered_devices],
                 )
                 
                 # Create hub entry with discovered devices info
                 self._hub_data["discovered_devices"] = [
-                    d.get('serial') for d in self._discovered_devices
+                    d.serial for d in self._discovered_devices
                 ]
                 
+                # Hand the authenticated hub over to the entry setup
+                async_store_validated_hub(self.hass, hub)
+                
                 return self.async_create_entry(
                     title=f"EcoWater Hub ({user_input[CONF_USERNAME]})",
                     data=self._hub_data,
                 )
                 
+            except IquaAuthError:
+                errors["base"] = "invalid_auth"
             except IquaSoftenerException as err:
                 error_str = str(err).lower()
                 _LOGGER.debug("Validation error type: %s", type(err).__name__)
                 
-                if "authentication error" in error_str or "invalid user" in error_str:
-                    errors["base"] = "invalid_auth"
-                elif "502" in error_str:
+                if "502" in error_str:
                     errors["base"] = "server_unavailable"
                 else:
                     errors["base"] = "cannot_connect"
@@ -133,6 +163,8 @@ class IquaSoftenerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self, user_input: Optional[Dict[str, Any]] = None
     ) -> FlowResult:
         """Handle adding a device to existing hub."""
+        from iqua_softener import IquaSoftenerException
+
         errors: Dict[str, str] = {}
         
         # Get hub entry
@@ -195,6 +227,11 @@ class IquaSoftenerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self, user_input: Optional[Dict[str, Any]] = None
     ) -> FlowResult:
         """Handle legacy setup (single device without hub)."""
+        from iqua_softener import IquaSoftenerException
+
+        from .api import IquaAuthError
+        from .hub import async_store_validated_hub
+
         errors: Dict[str, str] = {}
         
         if user_input is not None:
@@ -206,18 +243,18 @@ class IquaSoftenerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             
             # Validate credentials before creating entry
             try:
-                await self._test_credentials(
+                hub = await self._test_credentials(
                     user_input[CONF_USERNAME],
                     user_input[CONF_PASSWORD],
                     user_input[CONF_DEVICE_SERIAL_NUMBER],
                 )
+            except IquaAuthError:
+                errors["base"] = "invalid_auth"
             except IquaSoftenerException as err:
                 error_str = str(err).lower()
                 _LOGGER.debug("Validation error type: %s", type(err).__name__)
                 
-                if "authentication error" in error_str or "invalid user" in error_str:
-                    errors["base"] = "invalid_auth"
-                elif "502" in error_str:
+                if "502" in error_str:
                     errors["base"] = "server_unavailable"
                 elif "device" in error_str or "serial" in error_str:
                     errors["base"] = "device_not_found"
@@ -228,6 +265,7 @@ class IquaSoftenerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 _LOGGER.exception("Unexpected error during validation")
             else:
                 # Connection successful - create entry (legacy mode)
+                async_store_validated_hub(self.hass, hub)
                 return self.async_create_entry(
                     title=f"iQua {user_input[CONF_DEVICE_SERIAL_NUMBER][-6:]}",
                     data={
@@ -268,10 +306,190 @@ class IquaSoftenerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             },
         )
 
+    async def async_step_reauth(self, entry_data: Mapping[str, Any]) -> FlowResult:
+        """Handle rejected credentials of a hub or standalone device."""
+        self._reauth_entry = self.hass.config_entries.async_get_entry(
+            self.context["entry_id"]
+        )
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(
+        self, user_input: Optional[Dict[str, Any]] = None
+    ) -> FlowResult:
+        """Ask for the new password and resume polling with it."""
+        from iqua_softener import IquaSoftenerException
+
+        from .api import IquaAuthError
+        from .hub import async_store_validated_hub
+
+        errors: Dict[str, str] = {}
+        entry = self._reauth_entry
+        username = entry.data[CONF_USERNAME]
+
+        if user_input is not None:
+            try:
+                hub = await self._async_validate_account(
+                    username, user_input[CONF_PASSWORD]
+                )
+            except IquaAuthError:
+                errors["base"] = "invalid_auth"
+            except IquaSoftenerException as err:
+                error_str = str(err).lower()
+                if "502" in error_str:
+                    errors["base"] = "server_unavailable"
+                else:
+                    errors["base"] = "cannot_connect"
+            except Exception:
+                errors["base"] = "unknown"
+                _LOGGER.exception("Unexpected error during reauthentication")
+            else:
+                from . import async_reload_entry
+
+                # Hand the authenticated client over to the reloaded entry
+                async_store_validated_hub(self.hass, hub)
+                # Every entry of the account gets the new password, as they
+                # share one client
+                account_entries = [
+                    other
+                    for other in self.hass.config_entries.async_entries(DOMAIN)
+                    if other.data.get(CONF_USERNAME, "").lower() == username.lower()
+                ]
+                for account_entry in account_entries:
+                    loaded = (
+                        account_entry.state is config_entries.ConfigEntryState.LOADED
+                    )
+                    self.hass.config_entries.async_update_entry(
+                        account_entry,
+                        data={
+                            **account_entry.data,
+                            CONF_PASSWORD: user_input[CONF_PASSWORD],
+                        },
+                    )
+                    if not loaded and not account_entry.disabled_by:
+                        # A loaded entry is reloaded (with its devices) by its
+                        # update listener when the credentials change
+                        await async_reload_entry(self.hass, account_entry)
+                self._async_abort_account_reauth_flows(account_entries)
+                return self.async_abort(reason="reauth_successful")
+
+        return self.async_show_form(
+            step_id="reauth_confirm",
+            data_schema=vol.Schema({vol.Required(CONF_PASSWORD): str}),
+            description_placeholders={"username": username},
+            errors=errors,
+        )
+
+    @callback
+    def _async_abort_account_reauth_flows(
+        self, account_entries: List[config_entries.ConfigEntry]
+    ) -> None:
+        """Abort other reauth flows of the account, now resolved."""
+        entry_ids = {account_entry.entry_id for account_entry in account_entries}
+        for flow in self.hass.config_entries.flow.async_progress_by_handler(DOMAIN):
+            if (
+                flow["flow_id"] != self.flow_id
+                and flow["context"].get("source") == config_entries.SOURCE_REAUTH
+                and flow["context"].get("entry_id") in entry_ids
+            ):
+                self.hass.config_entries.flow.async_abort(flow["flow_id"])
+
+    async def _async_validate_account(
+        self, username: str, password: str
+    ) -> "IquaHub":
+        """Validate credentials with signin and device list only."""
+        from .api import IquaApiClient, REQUEST_TIMEOUT, VALIDATION_TIMEOUT
+        from .hub import IquaHub
+
+        hub = IquaHub(
+            self.hass,
+            username,
+            password,
+            IquaApiClient(username, password, timeout=VALIDATION_TIMEOUT),
+        )
+        # Always list, as a cached listing would not test the credentials
+        await hub.async_discover_devices()
+        hub.client.timeout = REQUEST_TIMEOUT
+        return hub
+
     async def _test_credentials(
         self, username: str, password: str, serial_number: str
-    ) -> None:
-        """Test if credentials are valid."""
-        softener = IquaSoftener(username, password, serial_number)
-        # Attempt to fetch data to validate credentials
-        await self.hass.async_add_executor_job(softener.get_data)
+    ) -> "IquaHub":
+        """Test if credentials are valid and the device is accessible."""
+        from .worker_pool import async_get_worker_pool
+
+        hub = await self._async_validate_account(username, password)
+        if serial_number not in hub.devices:
+            # Not in the account listing - fall back to fetching its data
+            await async_get_worker_pool(self.hass).async_run(
+                hub.client.get_device_snapshot, serial_number
+            )
+        return hub
+
+
+class IquaSoftenerOptionsFlow(config_entries.OptionsFlow):
+    """Handle iQua Softener options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize options flow."""
+        self._entry = config_entry
+
+    async def async_step_init(
+        self, user_input: Optional[Dict[str, Any]] = None
+    ) -> FlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self._entry.options
+        if self._entry.data.get(CONF_IS_HUB):
+            return self.async_show_form(
+                step_id="init",
+                data_schema=vol.Schema(
+                    {
+                        vol.Optional(
+                            CONF_MAX_CONCURRENT_REQUESTS,
+                            default=options.get(
+                                CONF_MAX_CONCURRENT_REQUESTS,
+                                DEFAULT_MAX_CONCURRENT_REQUESTS,
+                            ),
+                        ): vol.All(vol.Coerce(int), vol.Range(min=1, max=16)),
+                    }
+                ),
+            )
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_SCAN_INTERVAL,
+                        default=options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=60)),
+                    vol.Optional(
+                        CONF_STALE_WINDOW,
+                        default=options.get(CONF_STALE_WINDOW, DEFAULT_STALE_WINDOW),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=1440)),
+                    vol.Optional(
+                        CONF_SALT_LOW_THRESHOLD,
+                        default=options.get(
+                            CONF_SALT_LOW_THRESHOLD, DEFAULT_SALT_LOW_THRESHOLD
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=100)),
+                    vol.Optional(
+                        CONF_OUT_OF_SALT_DAYS_THRESHOLD,
+                        default=options.get(
+                            CONF_OUT_OF_SALT_DAYS_THRESHOLD,
+                            DEFAULT_OUT_OF_SALT_DAYS_THRESHOLD,
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=365)),
+                    vol.Optional(
+                        CONF_LEAK_DURATION,
+                        default=options.get(CONF_LEAK_DURATION, DEFAULT_LEAK_DURATION),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=48)),
+                    vol.Optional(
+                        CONF_SUMMARY_MODE,
+                        default=options.get(CONF_SUMMARY_MODE, DEFAULT_SUMMARY_MODE),
+                    ): bool,
+                }
+            ),
+        )
@@ -9,6 +9,40 @@ CONF_DEVICE_SERIAL_NUMBER: Final = "device_sn"
 CONF_IS_HUB: Final = "is_hub"
 CONF_HUB_ID: Final = "hub_id"
 
+# Option keys
+CONF_STALE_WINDOW: Final = "stale_window"
+CONF_SALT_LOW_THRESHOLD: Final = "salt_low_threshold"
+CONF_OUT_OF_SALT_DAYS_THRESHOLD: Final = "out_of_salt_days_threshold"
+CONF_SUMMARY_MODE: Final = "summary_mode"
+CONF_LEAK_DURATION: Final = "leak_duration"
+CONF_SCAN_INTERVAL: Final = "scan_interval"
+CONF_MAX_CONCURRENT_REQUESTS: Final = "max_concurrent_requests"
+
+# Option defaults
+DEFAULT_STALE_WINDOW: Final = 15  # minutes
+DEFAULT_SALT_LOW_THRESHOLD: Final = 20  # percent
+DEFAULT_OUT_OF_SALT_DAYS_THRESHOLD: Final = 14  # days
+DEFAULT_SUMMARY_MODE: Final = False
+DEFAULT_LEAK_DURATION: Final = 4  # hours
+DEFAULT_SCAN_INTERVAL: Final = 5  # minutes
+DEFAULT_MAX_CONCURRENT_REQUESTS: Final = 4
+
+# Events fired on the bus when consecutive polls cross a transition
+EVENT_REGENERATION_STARTED: Final = f"{DOMAIN}_regeneration_started"
+EVENT_SALT_LOW: Final = f"{DOMAIN}_salt_low"
+EVENT_OUT_OF_SALT_SOON: Final = f"{DOMAIN}_out_of_salt_soon"
+EVENT_FLOW_STARTED: Final = f"{DOMAIN}_flow_started"
+EVENT_FLOW_STOPPED: Final = f"{DOMAIN}_flow_stopped"
+
+# Integration-wide objects stored in hass.data[DOMAIN]
+DATA_COALESCER: Final = "coalescer"
+DATA_VALIDATED_HUBS: Final = "validated_hubs"
+DATA_HUB_READY: Final = "hub_ready"
+DATA_WORKER_POOL: Final = "worker_pool"
+DATA_TOKEN_STORE: Final = "token_store"
+DATA_CLIENTS: Final = "clients"
+
 # Units
+VOLUME_UNIT_LITERS: Final = 1  # volumeUnitEnum value for metric devices
 VOLUME_FLOW_RATE_LITERS_PER_MINUTE: Final = "L/m"
 VOLUME_FLOW_RATE_GALLONS_PER_MINUTE: Final = "gal/m"
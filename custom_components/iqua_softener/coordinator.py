@@ -1,31 +1,234 @@
 """DataUpdateCoordinator for iQua Softener."""
 import asyncio
 import logging
-from datetime import timedelta
+import time
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Optional
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryAuthFailed
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
-from iqua_softener import IquaSoftener, IquaSoftenerData, IquaSoftenerException
+from iqua_softener import IquaSoftenerException
+
+from .aggregates import IquaUsageAggregator
+from .api import IquaApiClient, IquaAuthError
+from .clients import async_get_client_registry
+from .coalescer import async_get_coalescer
+from .const import (
+    DEFAULT_LEAK_DURATION,
+    DEFAULT_OUT_OF_SALT_DAYS_THRESHOLD,
+    DEFAULT_SALT_LOW_THRESHOLD,
+)
+from .events import IquaEventDetector
+from .forecast import IquaSaltForecaster
+from .history import IquaHistoryLog
+from .leak import IquaLeakDetector
+from .models import IquaDeviceSnapshot
 
 _LOGGER = logging.getLogger(__name__)
 UPDATE_INTERVAL = timedelta(minutes=5)
+# Time budget for one refresh, including retries and backoff
+CYCLE_DEADLINE = timedelta(seconds=60)
 
 
-class IquaSoftenerCoordinator(DataUpdateCoordinator[IquaSoftenerData]):
+class IquaSoftenerCoordinator(DataUpdateCoordinator[IquaDeviceSnapshot]):
     """Coordinator for fetching iQua Softener data with retry logic."""
 
-    def __init__(self, hass: HomeAssistant, iqua_softener: IquaSoftener) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: IquaApiClient,
+        device_serial: str,
+        update_interval: timedelta = UPDATE_INTERVAL,
+        stale_window: timedelta = timedelta(),
+        salt_low_threshold: int = DEFAULT_SALT_LOW_THRESHOLD,
+        out_of_salt_days_threshold: int = DEFAULT_OUT_OF_SALT_DAYS_THRESHOLD,
+        leak_duration: timedelta = timedelta(hours=DEFAULT_LEAK_DURATION),
+        hub_entry_id: Optional[str] = None,
+    ) -> None:
         """Initialize coordinator."""
         super().__init__(
             hass,
             _LOGGER,
             name="Iqua Softener",
-            update_interval=UPDATE_INTERVAL,
+            update_interval=update_interval,
+        )
+        self._client = client
+        self._device_serial = device_serial
+        # Entry that owns the account credentials; None for standalone devices
+        self._hub_entry_id = hub_entry_id
+        self._coalescer = async_get_coalescer(hass)
+        self.stale_window = stale_window
+        self.last_good_update: Optional[datetime] = None
+        self.cycle_deadline = CYCLE_DEADLINE
+        self.overrun_count = 0
+        # Serializes manual and scheduled refreshes
+        self._refresh_lock = asyncio.Lock()
+        # Refresh work in flight, cancelled on shutdown
+        self._fetch_task: Optional[asyncio.Task] = None
+        self._shutting_down = False
+        self.events = IquaEventDetector(
+            hass, device_serial, salt_low_threshold, out_of_salt_days_threshold
+        )
+        self.leak = IquaLeakDetector(leak_duration)
+        self.aggregates = IquaUsageAggregator(hass, device_serial)
+        self.salt_forecast = IquaSaltForecaster(hass, device_serial)
+        self.history = IquaHistoryLog(hass, device_serial)
+
+    @callback
+    def async_apply_options(
+        self,
+        update_interval: timedelta,
+        stale_window: timedelta,
+        salt_low_threshold: int,
+        out_of_salt_days_threshold: int,
+        leak_duration: timedelta,
+    ) -> None:
+        """
+        Apply changed options to the running coordinator.
+
+        A new update interval takes effect from the next scheduled poll.
+        """
+        self.update_interval = update_interval
+        self.stale_window = stale_window
+        self.events.salt_low_threshold = salt_low_threshold
+        self.events.out_of_salt_days_threshold = out_of_salt_days_threshold
+        self.leak.min_duration = leak_duration
+        self.async_update_listeners()
+
+    @property
+    def client(self) -> IquaApiClient:
+        """Return the account API client."""
+        return self._client
+
+    @property
+    def device_serial(self) -> str:
+        """Return the device serial number."""
+        return self._device_serial
+
+    @property
+    def data_age(self) -> Optional[timedelta]:
+        """Return how old the current data is."""
+        if self.last_good_update is None:
+            return None
+        return dt_util.utcnow() - self.last_good_update
+
+    @property
+    def is_stale(self) -> bool:
+        """Return True if the last refresh failed and older data is served."""
+        return not self.last_update_success and self.data is not None
+
+    @property
+    def within_stale_window(self) -> bool:
+        """Return True if the last good data may still be served."""
+        age = self.data_age
+        return age is not None and age <= self.stale_window
+
+    @callback
+    def async_set_updated_data(self, data: IquaDeviceSnapshot) -> None:
+        """Set data obtained outside a refresh (e.g. hub prefetch)."""
+        super().async_set_updated_data(self._async_process_snapshot(data))
+
+    @callback
+    def _async_process_snapshot(self, data: IquaDeviceSnapshot) -> IquaDeviceSnapshot:
+        """Record a good poll and feed it to the detectors and aggregates."""
+        self.last_good_update = dt_util.utcnow()
+        self.salt_forecast.async_process(data, self.last_good_update)
+        self.events.async_process(data)
+        self.leak.async_process(data, self.last_good_update)
+        self.aggregates.async_process(data)
+        self.history.async_append(data, self.last_good_update)
+        async_get_client_registry(self.hass).async_set_snapshot(
+            self._client.username, self._device_serial, data, self.last_good_update
         )
-        self._iqua_softener = iqua_softener
+        return data
+
+    @callback
+    def async_restore_data(
+        self, data: IquaDeviceSnapshot, fetched_at: datetime
+    ) -> None:
+        """
+        Start from a snapshot processed before the entry reloaded.
+
+        Only the detectors comparing consecutive polls take it as their
+        baseline; the totals, salt fit and history already include it.
+        """
+        self.last_good_update = fetched_at
+        self.events.async_process(data)
+        self.leak.async_process(data, fetched_at)
+        super().async_set_updated_data(data)
+
+    @callback
+    def _async_handle_auth_failure(self, err: IquaAuthError) -> None:
+        """
+        Stop polling the account until new credentials are saved.
+
+        The client refuses further requests once its credentials are
+        rejected. Hub devices share one reauth flow on the hub entry;
+        standalone devices reauthenticate their own entry.
+        """
+        if self._hub_entry_id is None:
+            raise ConfigEntryAuthFailed(str(err)) from err
+
+        hub_entry = self.hass.config_entries.async_get_entry(self._hub_entry_id)
+        if hub_entry is not None:
+            # No-op while a reauth flow for the hub is already in progress
+            hub_entry.async_start_reauth(self.hass)
+        raise UpdateFailed(f"Authentication failed: {err}") from err
+
+    async def _async_update_data(self) -> IquaDeviceSnapshot:
+        """Fetch data within the cycle deadline, cancelling work that overruns it."""
+        async with self._refresh_lock:
+            if self._shutting_down:
+                raise UpdateFailed("Coordinator is shutting down")
+            budget = self.cycle_deadline.total_seconds()
+            if self.update_interval is not None:
+                # Never run into the next scheduled refresh
+                budget = min(budget, self.update_interval.total_seconds())
+            deadline = time.monotonic() + budget
+            self._fetch_task = asyncio.ensure_future(
+                self._async_fetch_with_retries(deadline)
+            )
+            try:
+                return await asyncio.wait_for(self._fetch_task, budget)
+            except asyncio.CancelledError:
+                current = asyncio.current_task()
+                if current is not None and current.cancelling():
+                    raise
+                # Only the fetch was cancelled, by async_shutdown()
+                raise UpdateFailed("Update cancelled by shutdown") from None
+            except asyncio.TimeoutError as err:
+                self.overrun_count += 1
+                _LOGGER.warning(
+                    "Update of device %s cancelled after %.0fs deadline",
+                    self._device_serial,
+                    budget,
+                )
+                raise UpdateFailed(
+                    f"Update deadline of {budget:.0f}s exceeded"
+                ) from err
+
+    async def async_shutdown(self) -> None:
+        """
+        Stop polling and cancel a refresh in flight.
+
+        Cancels the retry backoff and this coordinator's wait for the
+        request. The request itself is shared with other callers through
+        the coalescer, so it is left to finish for them; its timeout is
+        bounded by the cycle deadline.
+        """
+        self._shutting_down = True
+        await super().async_shutdown()
+        task = self._fetch_task
+        if task is None or task.done():
+            return
+        task.cancel()
+        await asyncio.wait([task])
 
-    async def _async_update_data(self) -> IquaSoftenerData:
+    async def _async_fetch_with_retries(self, deadline: float) -> IquaDeviceSnapshot:
         """Fetch data with retry logic for transient errors."""
         retries = 3
         backoff = 1.0
@@ -34,27 +237,38 @@ class IquaSoftenerCoordinator(DataUpdateCoordinator[IquaSoftenerData]):
             try:
                 _LOGGER.debug(
                     "Fetching data for device %s (attempt %d/%d)",
-                    self._iqua_softener.device_serial_number,
+                    self._device_serial,
                     attempt + 1,
                     retries,
                 )
-                data = await self.hass.async_add_executor_job(
-                    self._iqua_softener.get_data
+                data = await self._coalescer.async_fetch(
+                    self._client.username,
+                    self._device_serial,
+                    partial(
+                        self._client.get_device_snapshot,
+                        self._device_serial,
+                        deadline,
+                    ),
                 )
                 _LOGGER.info(
                     "Successfully fetched data for device %s - State: %s, Salt: %s%%",
-                    self._iqua_softener.device_serial_number,
-                    data.state.value,
+                    self._device_serial,
+                    data.state,
                     data.salt_level_percent,
                 )
-                return data
+                return self._async_process_snapshot(data)
+            except IquaAuthError as err:
+                self._async_handle_auth_failure(err)
             except IquaSoftenerException as err:
                 error_str = str(err)
 
-                # Retry on 502 Bad Gateway or network errors
+                # Retry on 502 Bad Gateway or network errors, if the
+                # backoff still fits in the cycle deadline
                 if (
-                    "502" in error_str or "timeout" in error_str.lower()
-                ) and attempt < retries - 1:
+                    ("502" in error_str or "timeout" in error_str.lower())
+                    and attempt < retries - 1
+                    and time.monotonic() + backoff < deadline
+                ):
                     _LOGGER.warning(
                         "Transient error (attempt %d/%d): %s. Retrying in %.1fs...",
                         attempt + 1,
@@ -1,10 +1,22 @@
 """Diagnostics support for iQua Softener."""
-from typing import Any
+from typing import Any, Dict, Optional
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 
-from .const import DOMAIN, CONF_IS_HUB, CONF_USERNAME, CONF_DEVICE_SERIAL_NUMBER
+from .const import (
+    DOMAIN,
+    CONF_IS_HUB,
+    CONF_USERNAME,
+    CONF_DEVICE_SERIAL_NUMBER,
+    DATA_WORKER_POOL,
+)
+
+
+def _worker_pool_stats(hass: HomeAssistant) -> Optional[Dict[str, int]]:
+    """Return the worker pool counters, without creating a pool."""
+    pool = hass.data.get(DOMAIN, {}).get(DATA_WORKER_POOL)
+    return pool.stats if pool is not None else None
 
 
 async def async_get_config_entry_diagnostics(
@@ -26,11 +38,13 @@ async def async_get_config_entry_diagnostics(
             "devices": [
                 {
                     "serial": device_serial,
-                    "model": device_info.get("model"),
-                    "state": device_info.get("state"),
+                    "model": device_info.model,
+                    "system_type": device_info.system_type,
+                    "state": device_info.state,
                 }
                 for device_serial, device_info in hub.devices.items()
             ],
+            "worker_pool": _worker_pool_stats(hass),
         }
     else:
         # Device diagnostics
@@ -42,10 +56,27 @@ async def async_get_config_entry_diagnostics(
             "hub_id": data.get("hub_id"),
             "coordinator": {
                 "last_update_success": coordinator.last_update_success,
-                "last_update_time": coordinator.last_update_success_time.isoformat()
-                if coordinator.last_update_success_time
+                "last_update_time": coordinator.last_good_update.isoformat()
+                if coordinator.last_good_update
+                else None,
+                "data_age_seconds": int(coordinator.data_age.total_seconds())
+                if coordinator.data_age is not None
                 else None,
                 "update_interval": str(coordinator.update_interval),
+                "stale": coordinator.is_stale,
+                "stale_window": str(coordinator.stale_window),
+                "cycle_deadline": str(coordinator.cycle_deadline),
+                "deadline_overruns": coordinator.overrun_count,
+            },
+            "worker_pool": _worker_pool_stats(hass),
+            "usage_aggregates_liters": {
+                period: {
+                    "start": totals.start.isoformat(),
+                    "total": totals.total,
+                    "completed": totals.completed,
+                    "average": totals.average,
+                }
+                for period, totals in coordinator.aggregates.periods.items()
             },
         }
         
@@ -53,16 +84,15 @@ async def async_get_config_entry_diagnostics(
         if coordinator.data:
             device_data = coordinator.data
             diagnostics_data["device_data"] = {
-                "state": str(device_data.state.value) if hasattr(device_data, 'state') else None,
-                "salt_level": device_data.salt_level_percent if hasattr(device_data, 'salt_level_percent') else None,
-                "device_date_time": device_data.device_date_time.isoformat() if hasattr(device_data, 'device_date_time') else None,
-                "volume_unit": str(device_data.volume_unit.value) if hasattr(device_data, 'volume_unit') else None,
-                "model": getattr(device_data, 'model', None),
-                "firmware": getattr(device_data, 'firmware_version', None),
-                "total_water_available": getattr(device_data, 'total_water_available', None),
-                "current_water_flow": getattr(device_data, 'current_water_flow', None),
-                "today_use": getattr(device_data, 'today_use', None),
-                "average_daily_use": getattr(device_data, 'average_daily_use', None),
+                "state": device_data.state,
+                "salt_level": device_data.salt_level_percent,
+                "device_date_time": device_data.device_date_time.isoformat(),
+                "volume_unit": str(device_data.volume_unit),
+                "model": device_data.model,
+                "total_water_available": device_data.total_water_available,
+                "current_water_flow": device_data.current_water_flow,
+                "today_use": device_data.today_use,
+                "average_daily_use": device_data.average_daily_use,
             }
         
         return diagnostics_data
@@ -0,0 +1,102 @@
+"""Transition events computed from consecutive iQua Softener snapshots."""
+import logging
+from typing import Any, Dict, Optional
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import (
+    EVENT_FLOW_STARTED,
+    EVENT_FLOW_STOPPED,
+    EVENT_OUT_OF_SALT_SOON,
+    EVENT_REGENERATION_STARTED,
+    EVENT_SALT_LOW,
+)
+from .models import IquaDeviceSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class IquaEventDetector:
+    """Fire bus events when a device's readings cross a transition."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        device_serial: str,
+        salt_low_threshold: int,
+        out_of_salt_days_threshold: int,
+    ) -> None:
+        """Initialize the detector."""
+        self.hass = hass
+        self._device_serial = device_serial
+        self.salt_low_threshold = salt_low_threshold
+        self.out_of_salt_days_threshold = out_of_salt_days_threshold
+        self._previous: Optional[IquaDeviceSnapshot] = None
+
+    @callback
+    def async_process(self, snapshot: IquaDeviceSnapshot) -> None:
+        """Compare a new snapshot with the previous one and fire events."""
+        previous, self._previous = self._previous, snapshot
+        if previous is None:
+            return
+
+        if _decreased(
+            previous.days_since_last_regeneration,
+            snapshot.days_since_last_regeneration,
+        ):
+            self._fire(
+                EVENT_REGENERATION_STARTED,
+                days_since_last_regeneration=snapshot.days_since_last_regeneration,
+            )
+
+        if _crossed_below(
+            previous.salt_level_percent,
+            snapshot.salt_level_percent,
+            self.salt_low_threshold,
+        ):
+            self._fire(
+                EVENT_SALT_LOW,
+                salt_level_percent=snapshot.salt_level_percent,
+                threshold=self.salt_low_threshold,
+            )
+
+        if _crossed_below(
+            previous.out_of_salt_estimated_days,
+            snapshot.out_of_salt_estimated_days,
+            self.out_of_salt_days_threshold + 1,
+        ):
+            self._fire(
+                EVENT_OUT_OF_SALT_SOON,
+                out_of_salt_estimated_days=snapshot.out_of_salt_estimated_days,
+                threshold=self.out_of_salt_days_threshold,
+            )
+
+        if previous.current_water_flow <= 0 < snapshot.current_water_flow:
+            self._fire(
+                EVENT_FLOW_STARTED,
+                current_water_flow=snapshot.current_water_flow,
+            )
+        elif snapshot.current_water_flow <= 0 < previous.current_water_flow:
+            self._fire(EVENT_FLOW_STOPPED, current_water_flow=0)
+
+    def _fire(self, event_type: str, **data: Any) -> None:
+        """Fire an event for this device."""
+        event_data: Dict[str, Any] = {"device_serial": self._device_serial, **data}
+        _LOGGER.debug("Firing %s for device %s", event_type, self._device_serial)
+        self.hass.bus.async_fire(event_type, event_data)
+
+
+def _decreased(previous: Optional[int], current: Optional[int]) -> bool:
+    """Return True if a counter went down (i.e. was reset)."""
+    return previous is not None and current is not None and current < previous
+
+
+def _crossed_below(
+    previous: Optional[int], current: Optional[int], threshold: int
+) -> bool:
+    """Return True if a value moved from at/above the threshold to below it."""
+    return (
+        previous is not None
+        and current is not None
+        and previous >= threshold > current
+    )
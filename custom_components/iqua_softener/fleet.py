@@ -0,0 +1,137 @@
+"""Fleet-wide aggregates across the devices of one hub."""
+from dataclasses import dataclass
+import logging
+from typing import Callable, Dict, List, Optional
+
+from homeassistant.core import CALLBACK_TYPE, callback
+
+from .aggregates import LITERS_PER_GALLON
+from .const import VOLUME_UNIT_LITERS
+from .models import IquaDeviceSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class IquaFleetContribution:
+    """What one device adds to the fleet aggregates."""
+
+    usage_liters: float = 0.0
+    flow_liters: float = 0.0
+    salt_level: Optional[int] = None
+    regenerated_today: bool = False
+    needs_salt: bool = False
+    metric: bool = True
+
+
+class IquaFleetAggregator:
+    """
+    Running fleet totals, adjusted by the difference each device update makes.
+
+    An update replaces a device's previous contribution, so its cost does not
+    depend on the fleet size. The minimum salt level is kept through a count
+    of devices per salt percentage, which has at most 101 keys.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty aggregates."""
+        self._contributions: Dict[str, IquaFleetContribution] = {}
+        self._salt_counts: Dict[int, int] = {}
+        self.usage_liters = 0.0
+        self.flow_liters = 0.0
+        self.regenerating = 0
+        self.needing_salt = 0
+        self.metric_devices = 0
+        self._listeners: List[Callable[[], None]] = []
+
+    @property
+    def device_count(self) -> int:
+        """Return the number of devices reporting."""
+        return len(self._contributions)
+
+    @property
+    def min_salt_level(self) -> Optional[int]:
+        """Return the lowest salt level in the fleet."""
+        return min(self._salt_counts) if self._salt_counts else None
+
+    @property
+    def metric(self) -> bool:
+        """Return True unless every reporting device uses US units."""
+        return self.metric_devices > 0 or not self._contributions
+
+    @callback
+    def async_add_listener(self, update_callback: Callable[[], None]) -> CALLBACK_TYPE:
+        """Call back when the aggregates change; returns a remove callback."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def async_update_device(
+        self,
+        device_serial: str,
+        data: IquaDeviceSnapshot,
+        salt_low_threshold: int,
+        out_of_salt_days_threshold: int,
+    ) -> None:
+        """Replace a device's contribution with one from its latest data."""
+        metric = data.volume_unit == VOLUME_UNIT_LITERS
+        to_liters = 1 if metric else LITERS_PER_GALLON
+        self._apply(
+            device_serial,
+            IquaFleetContribution(
+                usage_liters=(data.today_use or 0) * to_liters,
+                flow_liters=(data.current_water_flow or 0) * to_liters,
+                salt_level=data.salt_level_percent,
+                regenerated_today=data.days_since_last_regeneration == 0,
+                needs_salt=(
+                    data.salt_level_percent is not None
+                    and data.salt_level_percent < salt_low_threshold
+                )
+                or (
+                    data.out_of_salt_estimated_days is not None
+                    and data.out_of_salt_estimated_days <= out_of_salt_days_threshold
+                ),
+                metric=metric,
+            ),
+        )
+
+    @callback
+    def async_remove_device(self, device_serial: str) -> None:
+        """Drop a device's contribution."""
+        if device_serial in self._contributions:
+            self._apply(device_serial, None)
+
+    def _apply(
+        self, device_serial: str, new: Optional[IquaFleetContribution]
+    ) -> None:
+        """Subtract the old contribution, add the new one and notify listeners."""
+        old = self._contributions.pop(device_serial, None)
+        if old is not None:
+            self._add(old, -1)
+        if new is not None:
+            self._contributions[device_serial] = new
+            self._add(new, 1)
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    def _add(self, contribution: IquaFleetContribution, sign: int) -> None:
+        """Add (sign=1) or subtract (sign=-1) a contribution."""
+        self.usage_liters += sign * contribution.usage_liters
+        self.flow_liters += sign * contribution.flow_liters
+        self.regenerating += sign * contribution.regenerated_today
+        self.needing_salt += sign * contribution.needs_salt
+        self.metric_devices += sign * contribution.metric
+        if contribution.salt_level is not None:
+            count = self._salt_counts.get(contribution.salt_level, 0) + sign
+            if count:
+                self._salt_counts[contribution.salt_level] = count
+            else:
+                del self._salt_counts[contribution.salt_level]
+        if not self._contributions:
+            # Clear floating point drift once the fleet is empty
+            self.usage_liters = self.flow_liters = 0.0
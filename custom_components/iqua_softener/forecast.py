@@ -0,0 +1,212 @@
+"""Local salt depletion forecasting for iQua Softener."""
+from datetime import datetime
+import logging
+import math
+from typing import Any, Dict, Optional, Tuple
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .models import IquaDeviceSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+# Delay before writing the fit to disk after a change (seconds)
+SAVE_DELAY = 300
+
+# A rise of at least this many percent points is treated as a refill
+REFILL_MIN_RISE = 5
+# Samples needed before a forecast is given
+MIN_SAMPLES = 3
+# Minimum time between samples (seconds). The level is a whole percentage
+# that changes about once a day, so per-poll samples would repeat it and
+# shrink the interval without adding information
+SAMPLE_INTERVAL = 86400
+# Two-sided ~95% normal quantile for the confidence interval
+CONFIDENCE_Z = 1.96
+
+SECONDS_PER_DAY = 86400
+
+
+class IquaSaltForecaster:
+    """
+    Fit salt level against time since the last refill, one sample at a time.
+
+    Keeps only the running sums of an ordinary least squares fit, so each
+    sample is O(1) in time and memory. At most one sample a day is taken;
+    refills and regenerations are still detected on every poll. The
+    depletion estimate comes with an interval derived from the standard
+    error of the slope. Regenerations since the refill are counted to
+    report the salt used per regeneration.
+    """
+
+    def __init__(self, hass: HomeAssistant, device_serial: str) -> None:
+        """Initialize the forecaster."""
+        self._store: Store = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.salt_forecast.{device_serial}"
+        )
+        self._reset(None)
+        self._last_level: Optional[int] = None
+        self._last_days_since_regen: Optional[int] = None
+
+    def _reset(self, origin: Optional[float]) -> None:
+        """Start a new fit, e.g. after a refill."""
+        # Timestamp (seconds) that x = 0 days refers to
+        self._origin = origin
+        self._n = 0
+        self._sx = self._sy = self._sxx = self._sxy = self._syy = 0.0
+        self._last_sample: Optional[float] = None
+        self._refill_level: Optional[int] = None
+        self.regenerations = 0
+
+    async def async_load(self) -> None:
+        """Restore the fit saved before the last restart."""
+        data = await self._store.async_load()
+        if not data:
+            return
+        try:
+            (
+                self._origin,
+                self._n,
+                self._sx,
+                self._sy,
+                self._sxx,
+                self._sxy,
+                self._syy,
+            ) = data["fit"]
+            self._last_sample = data["last_sample"]
+            self._refill_level = data["refill_level"]
+            self.regenerations = data["regenerations"]
+            self._last_level = data["last_level"]
+            self._last_days_since_regen = data["last_days_since_regen"]
+        except (KeyError, TypeError, ValueError) as err:
+            _LOGGER.warning("Discarding unreadable salt forecast: %s", err)
+            self._reset(None)
+
+    @callback
+    def async_process(self, snapshot: IquaDeviceSnapshot, now: datetime) -> None:
+        """Fold a salt level reading into the fit, at most once per SAMPLE_INTERVAL."""
+        level = snapshot.salt_level_percent
+        timestamp = now.timestamp()
+
+        if self._last_level is not None and level >= self._last_level + REFILL_MIN_RISE:
+            _LOGGER.debug("Salt refill detected (%s%% -> %s%%)", self._last_level, level)
+            self._reset(timestamp)
+        elif self._origin is None:
+            self._reset(timestamp)
+        if self._refill_level is None:
+            self._refill_level = level
+
+        days_since_regen = snapshot.days_since_last_regeneration
+        if (
+            days_since_regen is not None
+            and self._last_days_since_regen is not None
+            and days_since_regen < self._last_days_since_regen
+        ):
+            self.regenerations += 1
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+        if days_since_regen is not None:
+            self._last_days_since_regen = days_since_regen
+        self._last_level = level
+
+        if (
+            self._last_sample is not None
+            and timestamp - self._last_sample < SAMPLE_INTERVAL
+        ):
+            return
+
+        self._last_sample = timestamp
+        x = (timestamp - self._origin) / SECONDS_PER_DAY
+        self._n += 1
+        self._sx += x
+        self._sy += level
+        self._sxx += x * x
+        self._sxy += x * level
+        self._syy += level * level
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def _fit(self) -> Optional[Tuple[float, float, float]]:
+        """Return (slope per day, mean x, mean y), or None without enough samples."""
+        if self._n < MIN_SAMPLES:
+            return None
+        sxx = self._sxx - self._sx * self._sx / self._n
+        if sxx <= 0:
+            return None
+        slope = (self._sxy - self._sx * self._sy / self._n) / sxx
+        return slope, self._sx / self._n, self._sy / self._n
+
+    def _slope_error(self, slope: float) -> float:
+        """Return the standard error of the fitted slope."""
+        if self._n <= 2:
+            return 0.0
+        sxx = self._sxx - self._sx * self._sx / self._n
+        syy = self._syy - self._sy * self._sy / self._n
+        sxy = self._sxy - self._sx * self._sy / self._n
+        residual = max(syy - slope * sxy, 0.0)
+        return math.sqrt(residual / (self._n - 2) / sxx)
+
+    def _depletion_at(self, slope: float, mean_x: float, mean_y: float) -> Optional[datetime]:
+        """Return when the line through the mean point reaches 0%."""
+        if slope >= 0:
+            return None
+        days = mean_x - mean_y / slope
+        return dt_util.utc_from_timestamp(self._origin + days * SECONDS_PER_DAY)
+
+    def forecast(self) -> Optional[Dict[str, Any]]:
+        """Return the depletion estimate with its confidence interval."""
+        fit = self._fit()
+        if fit is None:
+            return None
+        slope, mean_x, mean_y = fit
+        depletion = self._depletion_at(slope, mean_x, mean_y)
+        if depletion is None:
+            return None
+
+        error = CONFIDENCE_Z * self._slope_error(slope)
+        # A steeper slope empties sooner; a flat or rising one never does
+        earliest = self._depletion_at(slope - error, mean_x, mean_y)
+        latest = self._depletion_at(slope + error, mean_x, mean_y)
+        now_x = (dt_util.utcnow().timestamp() - self._origin) / SECONDS_PER_DAY
+        used = (self._refill_level or 0) - self._last_level
+        return {
+            "depletion": depletion,
+            "earliest": earliest,
+            "latest": latest,
+            "predicted_level": max(0.0, round(mean_y + slope * (now_x - mean_x), 1)),
+            "usage_per_day": round(-slope, 2),
+            "usage_per_regeneration": round(used / self.regenerations, 2)
+            if self.regenerations and used > 0
+            else None,
+            "samples": self._n,
+        }
+
+    def _data_to_save(self) -> Dict[str, Any]:
+        """Return the compact form written to storage."""
+        return {
+            "fit": [
+                self._origin,
+                self._n,
+                self._sx,
+                self._sy,
+                self._sxx,
+                self._sxy,
+                self._syy,
+            ],
+            "last_sample": self._last_sample,
+            "refill_level": self._refill_level,
+            "regenerations": self.regenerations,
+            "last_level": self._last_level,
+            "last_days_since_regen": self._last_days_since_regen,
+        }
+
+    async def async_save(self) -> None:
+        """Write the fit now, e.g. before the entry reloads."""
+        if self._origin is not None:
+            await self._store.async_save(self._data_to_save())
+
+    async def async_remove(self) -> None:
+        """Delete the stored fit."""
+        await self._store.async_remove()
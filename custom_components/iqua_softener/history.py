@@ -0,0 +1,189 @@
+"""Per-device reading history and streaming export for iQua Softener."""
+import csv
+from datetime import datetime
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+from homeassistant.util.json import json_loads
+
+from .const import DOMAIN
+from .models import IquaDeviceSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+HISTORY_DIR = f".storage/{DOMAIN}_history"
+EXPORT_DIR = f"{DOMAIN}_exports"
+
+# A log is rotated to `<serial>.ndjson.1` once it grows past this size
+MAX_LOG_BYTES = 16 * 1024 * 1024
+# Rows written between flushes of the export file
+EXPORT_CHUNK_ROWS = 1000
+
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_FORMAT_NDJSON = "ndjson"
+
+# Snapshot fields recorded per poll, in CSV column order
+HISTORY_FIELDS = (
+    "state",
+    "salt_level_percent",
+    "out_of_salt_estimated_days",
+    "days_since_last_regeneration",
+    "current_water_flow",
+    "today_use",
+    "average_daily_use",
+    "total_water_available",
+    "volume_unit",
+)
+CSV_COLUMNS = ("time", "serial", *HISTORY_FIELDS)
+
+
+def _timestamp(value: datetime) -> str:
+    """Format a time the way rows store it, so strings compare in time order."""
+    return dt_util.as_utc(value).isoformat(timespec="seconds")
+
+
+class IquaHistoryLog:
+    """
+    Append-only log of one device's readings, one JSON object per line.
+
+    Only the current and one rotated file are kept, which bounds disk use.
+    """
+
+    def __init__(self, hass: HomeAssistant, device_serial: str) -> None:
+        """Initialize the log."""
+        self.hass = hass
+        self.device_serial = device_serial
+        self.path = hass.config.path(HISTORY_DIR, f"{device_serial}.ndjson")
+        self._lock = threading.Lock()
+
+    @callback
+    def async_append(self, snapshot: IquaDeviceSnapshot, now: datetime) -> None:
+        """Record a reading without blocking the event loop."""
+        row: Dict[str, Any] = {"time": _timestamp(now), "serial": self.device_serial}
+        for field in HISTORY_FIELDS:
+            row[field] = getattr(snapshot, field)
+        self.hass.async_add_executor_job(self._append, json.dumps(row) + "\n")
+
+    def _append(self, line: str) -> None:
+        """Append a line, rotating the file when it is too large."""
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                if (
+                    os.path.exists(self.path)
+                    and os.path.getsize(self.path) >= MAX_LOG_BYTES
+                ):
+                    os.replace(self.path, f"{self.path}.1")
+                with open(self.path, "a", encoding="utf-8") as file:
+                    file.write(line)
+            except OSError as err:
+                _LOGGER.warning(
+                    "Failed to record history for device %s: %s",
+                    self.device_serial,
+                    err,
+                )
+
+    def remove(self) -> None:
+        """Delete the log files."""
+        for path in (f"{self.path}.1", self.path):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def _history_paths(hass: HomeAssistant, serials: Optional[Iterable[str]]) -> List[str]:
+    """Return log files to read, oldest first for each device."""
+    directory = hass.config.path(HISTORY_DIR)
+    if serials is None:
+        try:
+            serials = sorted(
+                name[: -len(".ndjson")]
+                for name in os.listdir(directory)
+                if name.endswith(".ndjson")
+            )
+        except FileNotFoundError:
+            return []
+    paths = []
+    for serial in serials:
+        path = os.path.join(directory, f"{os.path.basename(serial)}.ndjson")
+        paths.extend(p for p in (f"{path}.1", path) if os.path.exists(p))
+    return paths
+
+
+def _iter_rows(
+    paths: List[str], start: Optional[str], end: Optional[str]
+) -> Iterator[Dict[str, Any]]:
+    """Yield rows within [start, end] one at a time."""
+    for path in paths:
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                try:
+                    row = json_loads(line)
+                except ValueError:
+                    # Partially written last line
+                    continue
+                time = row.get("time", "")
+                if (start is None or time >= start) and (end is None or time <= end):
+                    yield row
+
+
+def _open_new(path: str) -> Tuple[TextIO, str]:
+    """Create a file that does not exist yet, numbering the name if taken."""
+    root, ext = os.path.splitext(path)
+    candidate = path
+    number = 0
+    while True:
+        try:
+            return open(candidate, "x", encoding="utf-8", newline=""), candidate
+        except FileExistsError:
+            number += 1
+            candidate = f"{root}_{number}{ext}"
+
+
+def export_history(
+    hass: HomeAssistant,
+    filename: str,
+    export_format: str,
+    serials: Optional[Iterable[str]] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """
+    Stream matching history rows to a file in the config directory.
+
+    Runs in the executor. Rows are read and written one at a time, so
+    memory use does not depend on the amount of history exported. An
+    existing file is never overwritten; the name gets a number instead.
+    """
+    path = hass.config.path(EXPORT_DIR, os.path.basename(filename))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    rows = _iter_rows(
+        _history_paths(hass, serials),
+        _timestamp(start) if start else None,
+        _timestamp(end) if end else None,
+    )
+
+    count = 0
+    file, path = _open_new(path)
+    with file:
+        if export_format == EXPORT_FORMAT_CSV:
+            writer = csv.DictWriter(file, CSV_COLUMNS, extrasaction="ignore")
+            writer.writeheader()
+            write = writer.writerow
+        else:
+
+            def write(row: Dict[str, Any]) -> None:
+                file.write(json.dumps(row) + "\n")
+
+        for row in rows:
+            write(row)
+            count += 1
+            if count % EXPORT_CHUNK_ROWS == 0:
+                file.flush()
+
+    _LOGGER.info("Exported %d history row(s) to %s", count, path)
+    return {"path": path, "rows": count}
@@ -1,28 +1,55 @@
 """Hub for EcoWater account managing multiple devices."""
+import asyncio
 import logging
-from typing import Dict, List, Optional
+import time
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Dict, List, Optional, Tuple
 
-import requests
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
 
-from iqua_softener import IquaSoftener, IquaSoftenerException
+from iqua_softener import IquaSoftenerException
 
-from homeassistant.core import HomeAssistant
+from .api import IquaApiClient
+from .clients import async_get_client_registry
+from .coalescer import async_get_coalescer
+from .const import DOMAIN, DATA_HUB_READY, DATA_VALIDATED_HUBS
+from .fleet import IquaFleetAggregator
+from .models import IquaDeviceRecord, IquaDeviceRegistry, IquaDeviceSnapshot
+from .worker_pool import async_get_worker_pool
 
 _LOGGER = logging.getLogger(__name__)
 
-API_BASE_URL = "https://apioem.ecowater.com/v1"
-USER_AGENT = "okhttp/3.12.1"
+# Minimum time between device list refreshes for lookups (seconds)
+LISTING_TTL = 60.0
+# How long a hub validated by the config flow waits for its entry (seconds)
+VALIDATED_HUB_TTL = 300
 
 
 class IquaHub:
     """Represents an EcoWater account (hub) that can manage multiple devices."""
 
-    def __init__(self, hass: HomeAssistant, username: str, password: str) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        username: str,
+        password: str,
+        client: Optional[IquaApiClient] = None,
+    ) -> None:
         """Initialize the hub."""
+        if client is None:
+            client = IquaApiClient(username, password)
+
         self.hass = hass
         self._username = username
         self._password = password
-        self._devices: Dict[str, dict] = {}
+        self._client = client
+        self._devices = IquaDeviceRegistry()
+        self._listed_at: Optional[float] = None
+        self._prefetched: Dict[str, IquaDeviceSnapshot] = {}
+        self._cancel_prefetch_expiry: Optional[CALLBACK_TYPE] = None
+        self.fleet = IquaFleetAggregator()
 
     @property
     def username(self) -> str:
@@ -35,21 +62,48 @@ class IquaHub:
         return self._password
 
     @property
-    def devices(self) -> Dict[str, dict]:
+    def client(self) -> IquaApiClient:
+        """Return the account API client."""
+        return self._client
+
+    @client.setter
+    def client(self, client: IquaApiClient) -> None:
+        """Use the account client registered for the integration."""
+        self._client = client
+
+    @property
+    def devices(self) -> IquaDeviceRegistry:
         """Return discovered devices."""
         return self._devices
 
     async def async_setup(self) -> bool:
         """Set up the hub and discover devices."""
+        registry = async_get_client_registry(self.hass)
+        listing = registry.async_get_listing(self._username)
+        if listing is not None and time.monotonic() - listing[0] < LISTING_TTL:
+            # Listed just before the entry reloaded; older listings are
+            # refreshed so a reload picks up added or removed devices
+            self._listed_at, devices = listing
+            for device in devices:
+                self._devices.upsert(device)
+            _LOGGER.debug(
+                "Reusing device list of account %s (%d device(s))",
+                self._username,
+                len(devices),
+            )
+            return True
+
         try:
             # Authenticate and discover devices
-            devices = await self.hass.async_add_executor_job(
-                self._authenticate_and_list_devices
+            devices = await async_get_worker_pool(self.hass).async_run(
+                self._client.list_devices
             )
             
             # Store discovered devices
             for device in devices:
-                self._devices[device['serial']] = device
+                self._devices.upsert(device)
+            self._listed_at = time.monotonic()
+            registry.async_set_listing(self._username, devices)
             
             _LOGGER.info(
                 "Hub setup successful for account %s, found %d device(s)",
@@ -61,119 +115,129 @@ class IquaHub:
             _LOGGER.error("Failed to setup hub: %s", err)
             raise
 
-    def _authenticate_and_list_devices(self) -> List[dict]:
-        """Authenticate and fetch list of devices from EcoWater API."""
-        session = requests.Session()
-        headers = {"User-Agent": USER_AGENT, "Content-Type": "application/json"}
-        
-        # Authenticate
-        try:
-            auth_response = session.post(
-                f"{API_BASE_URL}/auth/signin",
-                json={"username": self._username, "password": self._password},
-                headers=headers,
-                timeout=30,
-            )
-        except requests.exceptions.Timeout:
-            raise IquaSoftenerException("Connection timeout - server not responding")
-        except requests.exceptions.ConnectionError:
-            raise IquaSoftenerException("Cannot connect to EcoWater servers")
-        except requests.exceptions.RequestException as err:
-            raise IquaSoftenerException(f"Connection error: {err}")
-        
-        if auth_response.status_code == 401:
-            raise IquaSoftenerException("Authentication error: Invalid username or password")
-        if auth_response.status_code == 502:
-            raise IquaSoftenerException("Server unavailable (502) - try again later")
-        if auth_response.status_code != 200:
-            raise IquaSoftenerException(f"Authentication failed: HTTP {auth_response.status_code}")
+    async def async_prefetch(self, max_age: timedelta) -> None:
+        """
+        Fetch data for all discovered devices concurrently.
+
+        Devices with a snapshot younger than `max_age` in the client
+        registry (e.g. from before a reload) are skipped. Data no device
+        entry took within `max_age` is dropped.
+        """
+        registry = async_get_client_registry(self.hass)
+        serials = [
+            serial
+            for serial in self._devices
+            if registry.async_get_snapshot(self._username, serial, max_age) is None
+        ]
+        coalescer = async_get_coalescer(self.hass)
+        results = await asyncio.gather(
+            *(
+                coalescer.async_fetch(
+                    self._username,
+                    serial,
+                    partial(self._client.get_device_snapshot, serial),
+                )
+                for serial in serials
+            ),
+            return_exceptions=True,
+        )
         
-        try:
-            auth_data = auth_response.json()
-        except ValueError:
-            raise IquaSoftenerException("Invalid response from server")
-            
-        if auth_data.get("code") != "OK":
-            raise IquaSoftenerException(f"Authentication failed: {auth_data.get('message')}")
+        for serial, result in zip(serials, results):
+            if isinstance(result, Exception):
+                _LOGGER.debug("Prefetch failed for device %s: %s", serial, result)
+                continue
+            self._prefetched[serial] = result
         
-        token = auth_data["data"]["token"]
-        token_type = auth_data["data"]["tokenType"]
+        if self._cancel_prefetch_expiry is not None:
+            self._cancel_prefetch_expiry()
+        self._cancel_prefetch_expiry = async_call_later(
+            self.hass, max_age, self._async_expire_prefetched
+        )
         
-        # Fetch devices list
-        headers["Authorization"] = f"{token_type} {token}"
-        try:
-            devices_response = session.get(
-                f"{API_BASE_URL}/system",
-                headers=headers,
-                timeout=30,
+        _LOGGER.debug(
+            "Prefetched data for %d of %d device(s)",
+            len(self._prefetched),
+            len(serials),
+        )
+
+    def pop_prefetched(self, device_serial: str) -> Optional[IquaDeviceSnapshot]:
+        """Take the data prefetched for a device during hub setup, if any."""
+        return self._prefetched.pop(device_serial, None)
+
+    @callback
+    def async_clear_prefetched(self) -> None:
+        """Drop prefetched data no device entry has taken."""
+        if self._cancel_prefetch_expiry is not None:
+            self._cancel_prefetch_expiry()
+            self._cancel_prefetch_expiry = None
+        if self._prefetched:
+            _LOGGER.debug(
+                "Dropping unused prefetched data for %d device(s)",
+                len(self._prefetched),
             )
-        except requests.exceptions.RequestException as err:
-            raise IquaSoftenerException(f"Failed to fetch devices: {err}")
-        
-        if devices_response.status_code != 200:
-            raise IquaSoftenerException(f"Failed to fetch devices: HTTP {devices_response.status_code}")
-        
-        try:
-            devices_data = devices_response.json()
-        except ValueError:
-            raise IquaSoftenerException("Invalid response when fetching devices")
-            
-        if devices_data.get("code") != "OK":
-            raise IquaSoftenerException(f"Failed to fetch devices: {devices_data.get('message')}")
-        
-        # Parse devices
-        devices = []
-        for device in devices_data.get("data", []):
-            devices.append({
-                'serial': device.get('serialNumber'),
-                'nickname': device.get('nickname', 'Device'),
-                'model': device.get('modelDescription', 'Water Softener'),
-                'model_id': device.get('modelName'),
-                'system_type': device.get('systemType'),
-                'product_image': device.get('productImage'),
-            })
-        
-        return devices
+            self._prefetched.clear()
+
+    @callback
+    def _async_expire_prefetched(self, _now: datetime) -> None:
+        """Drop prefetched data once it is too old to start from."""
+        self._cancel_prefetch_expiry = None
+        self.async_clear_prefetched()
 
-    async def async_discover_devices(self) -> List[dict]:
+    async def async_discover_devices(self) -> List[IquaDeviceRecord]:
         """Discover devices (can be called to refresh device list)."""
-        devices = await self.hass.async_add_executor_job(
-            self._authenticate_and_list_devices
+        devices = await async_get_worker_pool(self.hass).async_run(
+            self._client.list_devices
         )
         
         # Update stored devices
         for device in devices:
-            self._devices[device['serial']] = device
+            self._devices.upsert(device)
+        self._listed_at = time.monotonic()
+        async_get_client_registry(self.hass).async_set_listing(self._username, devices)
         
         return devices
 
-    async def async_get_device(self, device_serial: str) -> Optional[dict]:
+    async def async_get_device(
+        self, device_serial: str
+    ) -> Optional[IquaDeviceRecord]:
         """
         Get specific device by serial number.
         
-        Since API doesn't provide device list, this method fetches
-        device data to verify it exists and is accessible.
+        Answered from the cached device list, which is refreshed at most
+        once per LISTING_TTL. Device data is only fetched for serials the
+        listing does not know about.
         """
+        if device_serial not in self._devices and (
+            self._listed_at is None
+            or time.monotonic() - self._listed_at >= LISTING_TTL
+        ):
+            try:
+                await self.async_discover_devices()
+            except IquaSoftenerException as err:
+                _LOGGER.debug("Failed to refresh device list: %s", err)
+        
         if device_serial in self._devices:
-            return self._devices[device_serial]
+            return self._devices.get(device_serial)
         
-        # Try to fetch device data to verify it exists
+        # Unknown to the listing - fetch device data to verify it exists
         try:
-            softener = IquaSoftener(self._username, self._password, device_serial)
-            data = await self.hass.async_add_executor_job(softener.get_data)
-            
-            device_info = {
-                'serial': device_serial,
-                'model': data.model if hasattr(data, 'model') else 'iQua Water Softener',
-                'firmware': getattr(data, 'firmware_version', None),
-                'state': str(data.state.value) if hasattr(data, 'state') else 'Unknown',
-            }
+            data = await async_get_coalescer(self.hass).async_fetch(
+                self._username,
+                device_serial,
+                partial(self._client.get_device_snapshot, device_serial),
+            )
             
-            self._devices[device_serial] = device_info
+            device_info = self._devices.upsert(
+                IquaDeviceRecord(
+                    serial=device_serial,
+                    model=data.model,
+                    state=data.state,
+                )
+            )
             _LOGGER.info(
                 "Device %s added to hub: %s",
                 device_serial,
-                device_info['model']
+                device_info.model
             )
             return device_info
             
@@ -181,12 +245,62 @@ class IquaHub:
             _LOGGER.error("Failed to get device %s: %s", device_serial, err)
             return None
 
-    def get_softener_for_device(self, device_serial: str) -> IquaSoftener:
-        """Get IquaSoftener instance for specific device."""
-        return IquaSoftener(self._username, self._password, device_serial)
-
     async def async_remove_device(self, device_serial: str) -> None:
         """Remove device from hub cache."""
-        if device_serial in self._devices:
-            self._devices.pop(device_serial)
+        if self._devices.remove(device_serial) is not None:
             _LOGGER.info("Device %s removed from hub", device_serial)
+
+
+@callback
+def async_store_validated_hub(hass: HomeAssistant, hub: IquaHub) -> None:
+    """
+    Keep a hub validated by the config flow for the entry it creates.
+
+    A hub not taken over within VALIDATED_HUB_TTL, e.g. because the entry
+    failed to set up, is dropped and its session closed.
+    """
+    validated: Dict[str, Tuple[IquaHub, CALLBACK_TYPE]] = hass.data.setdefault(
+        DOMAIN, {}
+    ).setdefault(DATA_VALIDATED_HUBS, {})
+    account = hub.username.lower()
+
+    @callback
+    def _async_expire(_now: datetime) -> None:
+        if account in validated and validated[account][0] is hub:
+            del validated[account]
+            _LOGGER.debug("Discarding unused validated hub for %s", hub.username)
+            hass.async_create_task(
+                async_get_worker_pool(hass).async_run(hub.client.close)
+            )
+
+    previous = async_pop_validated_hub(hass, account)
+    if previous is not None:
+        # Validated again before an entry took the previous hub over
+        hass.async_create_task(
+            async_get_worker_pool(hass).async_run(previous.client.close)
+        )
+    validated[account] = (hub, async_call_later(hass, VALIDATED_HUB_TTL, _async_expire))
+
+
+@callback
+def async_pop_validated_hub(hass: HomeAssistant, username: str) -> Optional[IquaHub]:
+    """Take over a hub validated by the config flow, if there is one."""
+    stored = (
+        hass.data.get(DOMAIN, {})
+        .get(DATA_VALIDATED_HUBS, {})
+        .pop(username.lower(), None)
+    )
+    if stored is None:
+        return None
+    hub, cancel_expiry = stored
+    cancel_expiry()
+    return hub
+
+
+@callback
+def async_get_hub_ready_event(hass: HomeAssistant, hub_id: str) -> asyncio.Event:
+    """Return the event set once the hub entry has finished loading."""
+    events = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_HUB_READY, {})
+    if hub_id not in events:
+        events[hub_id] = asyncio.Event()
+    return events[hub_id]
@@ -0,0 +1,126 @@
+"""Streaming leak detection over iQua Softener flow samples."""
+from datetime import datetime, timedelta
+import logging
+import math
+from typing import Optional
+
+from homeassistant.core import callback
+
+from .aggregates import LITERS_PER_GALLON
+from .const import VOLUME_UNIT_LITERS
+from .models import IquaDeviceSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+# Leaks are low flows; above this rate (liters per minute) water is in use
+LEAK_MAX_FLOW = 2.0
+# Leaks are steady; taps and appliances switching vary the flow more than
+# this fraction of its mean
+LEAK_MAX_FLOW_VARIATION = 0.5
+# Weight of the newest sample in the flow statistics, so usage earlier in a
+# run (e.g. a shower during a leak) is forgotten after 15-20 polls
+FLOW_SMOOTHING = 0.3
+
+
+class IquaLeakDetector:
+    """
+    Track how long water has been flowing without a break, and how.
+
+    Keeps constant-size running statistics over consecutive polls instead
+    of querying history. A zero flow sample only ends a flow run if
+    today's usage did not grow since the previous poll either, so short
+    pauses between samples are not mistaken for the end of a leak. A leak
+    is suspected once a run has lasted min_duration with a low, steady
+    flow: exponentially weighted mean and standard deviation of the flow
+    rate, so long runs of regular use (e.g. irrigation) are not reported.
+    """
+
+    def __init__(self, min_duration: timedelta) -> None:
+        """Initialize the detector."""
+        self.min_duration = min_duration
+        self.flow_started: Optional[datetime] = None
+        self.last_sample: Optional[datetime] = None
+        self.mean_flow: Optional[float] = None
+        self._flow_variance = 0.0
+        self._max_leak_flow = LEAK_MAX_FLOW
+        self._previous_today_use: Optional[int] = None
+
+    @property
+    def continuous_flow_duration(self) -> timedelta:
+        """Return how long the current flow run has lasted."""
+        if self.flow_started is None or self.last_sample is None:
+            return timedelta()
+        return self.last_sample - self.flow_started
+
+    @property
+    def flow_stddev(self) -> Optional[float]:
+        """Return the standard deviation of the flow rate in this run."""
+        if self.mean_flow is None:
+            return None
+        return math.sqrt(self._flow_variance)
+
+    @property
+    def low_steady_flow(self) -> bool:
+        """Return True if this run's flow is as low and steady as a leak's."""
+        if self.mean_flow is None:
+            # Usage grew, but too slowly for any poll to read a flow
+            return True
+        return (
+            self.mean_flow <= self._max_leak_flow
+            and self.flow_stddev <= LEAK_MAX_FLOW_VARIATION * self.mean_flow
+        )
+
+    @property
+    def leak_suspected(self) -> bool:
+        """Return True if a low, steady flow has lasted at least min_duration."""
+        return (
+            self.flow_started is not None
+            and self.continuous_flow_duration >= self.min_duration
+            and self.low_steady_flow
+        )
+
+    @callback
+    def async_process(self, snapshot: IquaDeviceSnapshot, now: datetime) -> None:
+        """Fold a new sample into the running statistics."""
+        flow = snapshot.current_water_flow
+        today_use = snapshot.today_use
+
+        previous_today_use, self._previous_today_use = (
+            self._previous_today_use,
+            today_use,
+        )
+        # A lower value is the device's midnight reset, not usage
+        usage_grew = (
+            previous_today_use is not None and today_use > previous_today_use
+        )
+
+        if flow <= 0 and not usage_grew:
+            if self.flow_started is not None:
+                _LOGGER.debug(
+                    "Flow run ended after %s", self.continuous_flow_duration
+                )
+            self.flow_started = None
+            self.mean_flow = None
+            self._flow_variance = 0.0
+            self.last_sample = now
+            return
+
+        if self.flow_started is None:
+            self.flow_started = now
+        self.last_sample = now
+
+        if flow > 0:
+            self._max_leak_flow = (
+                LEAK_MAX_FLOW
+                if snapshot.volume_unit == VOLUME_UNIT_LITERS
+                else LEAK_MAX_FLOW / LITERS_PER_GALLON
+            )
+            # Exponentially weighted mean and variance of the flow rate
+            if self.mean_flow is None:
+                self.mean_flow = flow
+                return
+            delta = flow - self.mean_flow
+            self.mean_flow += FLOW_SMOOTHING * delta
+            self._flow_variance = (1 - FLOW_SMOOTHING) * (
+                self._flow_variance + FLOW_SMOOTHING * delta * delta
+            )
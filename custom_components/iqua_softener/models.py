@@ -0,0 +1,160 @@
+"""Data models for iQua Softener."""
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Set
+from zoneinfo import ZoneInfo
+
+
+@dataclass(slots=True)
+class IquaDeviceRecord:
+    """A device known to an EcoWater account."""
+
+    serial: str
+    nickname: Optional[str] = None
+    model: Optional[str] = None
+    model_id: Optional[str] = None
+    system_type: Optional[str] = None
+    product_image: Optional[str] = None
+    state: Optional[str] = None
+
+    def as_dict(self) -> dict:
+        """Return the record as a plain dict."""
+        return asdict(self)
+
+
+@dataclass(frozen=True, slots=True)
+class IquaDeviceSnapshot:
+    """
+    The dashboard fields the integration consumes, for one poll.
+
+    Always parsed in full: one snapshot per device and poll is shared by
+    every sensor, detector and coalesced caller.
+    """
+
+    model: str
+    state: str
+    device_date_time: datetime
+    volume_unit: int
+    current_water_flow: float
+    today_use: int
+    average_daily_use: int
+    total_water_available: int
+    days_since_last_regeneration: int
+    salt_level_percent: int
+    out_of_salt_estimated_days: int
+
+    @classmethod
+    def from_dashboard(cls, data: Dict[str, Any]) -> "IquaDeviceSnapshot":
+        """
+        Parse the `data` member of a /system/<serial>/dashboard response.
+
+        Mirrors the conversions of iqua_softener's get_data() for the
+        fields above, keeping state and volume unit as plain values.
+        """
+        device_date = data["deviceDate"]
+        return cls(
+            model=f'{data["modelDescription"]["value"]} ({data["modelId"]["value"]})',
+            state=data["power"],
+            device_date_time=datetime.fromisoformat(device_date[:-1]).replace(
+                tzinfo=ZoneInfo(data["timeZoneEnum"]["value"])
+            ),
+            volume_unit=int(data["volumeUnitEnum"]["value"]),
+            current_water_flow=float(data["currentWaterFlow"]["value"]),
+            today_use=int(data["gallonsUsedToday"]["value"]),
+            average_daily_use=int(data["avgDailyUseGallons"]["value"]),
+            total_water_available=int(data["totalWaterAvailGals"]["value"]),
+            days_since_last_regeneration=int(data["daysSinceLastRegen"]["value"]),
+            salt_level_percent=int(data["saltLevelTenths"]["percent"]),
+            out_of_salt_estimated_days=int(data["outOfSaltEstDays"]["value"]),
+        )
+
+
+class IquaDeviceRegistry:
+    """Device records of one account, indexed by serial, system type and model."""
+
+    __slots__ = ("_by_serial", "_by_system_type", "_by_model")
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._by_serial: Dict[str, IquaDeviceRecord] = {}
+        self._by_system_type: Dict[str, Set[str]] = {}
+        self._by_model: Dict[str, Set[str]] = {}
+
+    def __contains__(self, serial: object) -> bool:
+        """Return True if the serial is known."""
+        return serial in self._by_serial
+
+    def __len__(self) -> int:
+        """Return the number of devices."""
+        return len(self._by_serial)
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over device serials."""
+        return iter(self._by_serial)
+
+    def get(self, serial: str) -> Optional[IquaDeviceRecord]:
+        """Return the record for a serial, if known."""
+        return self._by_serial.get(serial)
+
+    def values(self):
+        """Return all records."""
+        return self._by_serial.values()
+
+    def items(self):
+        """Return (serial, record) pairs."""
+        return self._by_serial.items()
+
+    def by_system_type(self, system_type: str) -> List[IquaDeviceRecord]:
+        """Return records of a system type."""
+        return [self._by_serial[s] for s in self._by_system_type.get(system_type, ())]
+
+    def by_model(self, model: str) -> List[IquaDeviceRecord]:
+        """Return records of a model."""
+        return [self._by_serial[s] for s in self._by_model.get(model, ())]
+
+    def upsert(self, record: IquaDeviceRecord) -> IquaDeviceRecord:
+        """
+        Add a record or merge it into the existing one.
+
+        Fields that are None in `record` leave the stored values untouched,
+        so partial records (e.g. from a data fetch) do not erase listing data.
+        """
+        current = self._by_serial.get(record.serial)
+        if current is None:
+            self._by_serial[record.serial] = record
+            self._index(record)
+            return record
+
+        self._unindex(current)
+        for field in IquaDeviceRecord.__slots__:
+            value = getattr(record, field)
+            if value is not None:
+                setattr(current, field, value)
+        self._index(current)
+        return current
+
+    def remove(self, serial: str) -> Optional[IquaDeviceRecord]:
+        """Remove and return a record."""
+        record = self._by_serial.pop(serial, None)
+        if record is not None:
+            self._unindex(record)
+        return record
+
+    def _index(self, record: IquaDeviceRecord) -> None:
+        """Add a record to the secondary indexes."""
+        if record.system_type is not None:
+            self._by_system_type.setdefault(record.system_type, set()).add(record.serial)
+        if record.model is not None:
+            self._by_model.setdefault(record.model, set()).add(record.serial)
+
+    def _unindex(self, record: IquaDeviceRecord) -> None:
+        """Remove a record from the secondary indexes."""
+        for index, key in (
+            (self._by_system_type, record.system_type),
+            (self._by_model, record.model),
+        ):
+            serials = index.get(key)
+            if serials is not None:
+                serials.discard(record.serial)
+                if not serials:
+                    del index[key]
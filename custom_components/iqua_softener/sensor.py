@@ -1,8 +1,9 @@
 """Sensor platform for iQua Softener."""
 from abc import ABC, abstractmethod
+import dataclasses
 from datetime import datetime, timedelta
 import logging
-from typing import Optional
+from typing import Any, Dict, Optional
 
 from homeassistant import config_entries, core
 from homeassistant.components.sensor import (
@@ -11,19 +12,24 @@ from homeassistant.components.sensor import (
     SensorStateClass,
     SensorEntityDescription,
 )
-from homeassistant.const import PERCENTAGE, UnitOfVolume
+from homeassistant.const import EntityCategory, PERCENTAGE, UnitOfTime, UnitOfVolume
 from homeassistant.core import callback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from iqua_softener import IquaSoftenerData, IquaSoftenerVolumeUnit
-
 from .const import (
     DOMAIN,
     CONF_DEVICE_SERIAL_NUMBER,
+    CONF_IS_HUB,
+    CONF_SUMMARY_MODE,
+    DEFAULT_SUMMARY_MODE,
+    VOLUME_UNIT_LITERS,
     VOLUME_FLOW_RATE_LITERS_PER_MINUTE,
     VOLUME_FLOW_RATE_GALLONS_PER_MINUTE,
 )
+from .aggregates import LITERS_PER_GALLON
 from .coordinator import IquaSoftenerCoordinator
+from .fleet import IquaFleetAggregator
+from .models import IquaDeviceSnapshot
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -34,6 +40,15 @@ async def async_setup_entry(
     async_add_entities,
 ):
     """Set up iQua Softener sensors from a config entry."""
+    if config_entry.data.get(CONF_IS_HUB, False):
+        async_add_entities(
+            _fleet_sensors(
+                hass.data[DOMAIN][config_entry.entry_id]["hub"].fleet,
+                config_entry.entry_id,
+            )
+        )
+        return
+
     # Get coordinator from hass.data (created in __init__.py)
     coordinator: IquaSoftenerCoordinator = hass.data[DOMAIN][config_entry.entry_id][
         "coordinator"
@@ -44,13 +59,32 @@ async def async_setup_entry(
     if config_entry.options:
         config.update(config_entry.options)
     device_serial_number = config[CONF_DEVICE_SERIAL_NUMBER]
+    summary_mode = config.get(CONF_SUMMARY_MODE, DEFAULT_SUMMARY_MODE)
     sensors = [
-        clz(coordinator, device_serial_number, entity_description)
+        clz(
+            coordinator,
+            device_serial_number,
+            # In summary mode the per-metric sensors are opt-in
+            dataclasses.replace(
+                entity_description, entity_registry_enabled_default=False
+            )
+            if summary_mode
+            else entity_description,
+        )
         for clz, entity_description in (
             (
                 IquaSoftenerStateSensor,
                 SensorEntityDescription(key="state", translation_key="state"),
             ),
+            (
+                IquaSoftenerLastUpdateSensor,
+                SensorEntityDescription(
+                    key="last_update",
+                    translation_key="last_update",
+                    device_class=SensorDeviceClass.TIMESTAMP,
+                    entity_category=EntityCategory.DIAGNOSTIC,
+                ),
+            ),
             (
                 IquaSoftenerDeviceDateTimeSensor,
                 SensorEntityDescription(
@@ -75,6 +109,15 @@ async def async_setup_entry(
                     device_class=SensorDeviceClass.TIMESTAMP,
                 ),
             ),
+            (
+                IquaSoftenerSaltDepletionForecastSensor,
+                SensorEntityDescription(
+                    key="salt_depletion_forecast",
+                    translation_key="salt_depletion_forecast",
+                    icon="mdi:chart-timeline-variant",
+                    device_class=SensorDeviceClass.TIMESTAMP,
+                ),
+            ),
             (
                 IquaSoftenerSaltLevelSensor,
                 SensorEntityDescription(
@@ -103,6 +146,17 @@ async def async_setup_entry(
                     icon="mdi:water-pump",
                 ),
             ),
+            (
+                IquaSoftenerContinuousFlowSensor,
+                SensorEntityDescription(
+                    key="continuous_flow_duration",
+                    translation_key="continuous_flow_duration",
+                    icon="mdi:water-sync",
+                    native_unit_of_measurement=UnitOfTime.MINUTES,
+                    state_class=SensorStateClass.MEASUREMENT,
+                    device_class=SensorDeviceClass.DURATION,
+                ),
+            ),
             (
                 IquaSoftenerWaterUsageTodaySensor,
                 SensorEntityDescription(
@@ -122,14 +176,200 @@ async def async_setup_entry(
                     device_class=SensorDeviceClass.WATER,
                 ),
             ),
+            (
+                IquaSoftenerWaterUsageWeekSensor,
+                SensorEntityDescription(
+                    key="water_usage_week",
+                    translation_key="water_usage_week",
+                    state_class=SensorStateClass.TOTAL,
+                    device_class=SensorDeviceClass.WATER,
+                ),
+            ),
+            (
+                IquaSoftenerWaterUsageMonthSensor,
+                SensorEntityDescription(
+                    key="water_usage_month",
+                    translation_key="water_usage_month",
+                    state_class=SensorStateClass.TOTAL,
+                    device_class=SensorDeviceClass.WATER,
+                ),
+            ),
+            (
+                IquaSoftenerWaterUsageWeeklyAverageSensor,
+                SensorEntityDescription(
+                    key="water_usage_weekly_average",
+                    translation_key="water_usage_weekly_average",
+                    state_class=SensorStateClass.MEASUREMENT,
+                    icon="mdi:water-outline",
+                ),
+            ),
+            (
+                IquaSoftenerWaterUsageMonthlyAverageSensor,
+                SensorEntityDescription(
+                    key="water_usage_monthly_average",
+                    translation_key="water_usage_monthly_average",
+                    state_class=SensorStateClass.MEASUREMENT,
+                    icon="mdi:water-outline",
+                ),
+            ),
         )
     ]
+    if summary_mode:
+        sensors.append(
+            IquaSoftenerSummarySensor(
+                coordinator,
+                device_serial_number,
+                SensorEntityDescription(
+                    key="summary",
+                    translation_key="summary",
+                    icon="mdi:water-check",
+                ),
+            )
+        )
     async_add_entities(sensors)
+
+
+def _fleet_sensors(fleet: IquaFleetAggregator, hub_id: str) -> list:
+    """Return the aggregate sensors of a hub."""
+    return [
+        clz(fleet, hub_id, entity_description)
+        for clz, entity_description in (
+            (
+                IquaFleetWaterUsageTodaySensor,
+                SensorEntityDescription(
+                    key="fleet_water_usage_today",
+                    translation_key="fleet_water_usage_today",
+                    state_class=SensorStateClass.MEASUREMENT,
+                    icon="mdi:water-minus",
+                ),
+            ),
+            (
+                IquaFleetWaterCurrentFlowSensor,
+                SensorEntityDescription(
+                    key="fleet_water_current_flow",
+                    translation_key="fleet_water_current_flow",
+                    icon="mdi:water-pump",
+                    state_class=SensorStateClass.MEASUREMENT,
+                ),
+            ),
+            (
+                IquaFleetMinSaltLevelSensor,
+                SensorEntityDescription(
+                    key="fleet_min_salt_level",
+                    translation_key="fleet_min_salt_level",
+                    icon="mdi:shaker-outline",
+                    native_unit_of_measurement=PERCENTAGE,
+                    state_class=SensorStateClass.MEASUREMENT,
+                ),
+            ),
+            (
+                IquaFleetRegeneratedTodaySensor,
+                SensorEntityDescription(
+                    key="fleet_devices_regenerated_today",
+                    translation_key="fleet_devices_regenerated_today",
+                    icon="mdi:autorenew",
+                    state_class=SensorStateClass.MEASUREMENT,
+                ),
+            ),
+            (
+                IquaFleetNeedingSaltSensor,
+                SensorEntityDescription(
+                    key="fleet_devices_needing_salt",
+                    translation_key="fleet_devices_needing_salt",
+                    icon="mdi:shaker",
+                    state_class=SensorStateClass.MEASUREMENT,
+                ),
+            ),
+        )
+    ]
+
+
+class IquaFleetSensor(SensorEntity, ABC):
+    """Hub sensor computed from the fleet aggregates, pushed on each device update."""
+
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+
+    def __init__(
+        self,
+        fleet: IquaFleetAggregator,
+        hub_id: str,
+        entity_description: SensorEntityDescription,
+    ):
+        self._fleet = fleet
+        self.entity_description = entity_description
+        self._attr_unique_id = f"{hub_id}_{entity_description.key}".lower()
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, hub_id)},
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """Follow fleet aggregate changes."""
+        self.async_on_remove(self._fleet.async_add_listener(self._handle_fleet_update))
+        self._handle_fleet_update()
+
+    @callback
+    def _handle_fleet_update(self) -> None:
+        """Update the state from the aggregates."""
+        self.update_from_fleet()
+        if self.hass is not None:
+            self.async_write_ha_state()
+
+    @property
+    def extra_state_attributes(self) -> Optional[Dict[str, Any]]:
+        """Return how many devices the value covers."""
+        return {"devices": self._fleet.device_count}
+
+    @abstractmethod
+    def update_from_fleet(self):
+        ...
+
+
+class IquaFleetWaterUsageTodaySensor(IquaFleetSensor):
+    def update_from_fleet(self):
+        if self._fleet.metric:
+            self._attr_native_value = round(self._fleet.usage_liters / 1000, 3)
+            self._attr_native_unit_of_measurement = UnitOfVolume.CUBIC_METERS
+        else:
+            self._attr_native_value = round(
+                self._fleet.usage_liters / LITERS_PER_GALLON, 1
+            )
+            self._attr_native_unit_of_measurement = UnitOfVolume.GALLONS
+
+
+class IquaFleetWaterCurrentFlowSensor(IquaFleetSensor):
+    def update_from_fleet(self):
+        if self._fleet.metric:
+            self._attr_native_value = round(self._fleet.flow_liters, 2)
+            self._attr_native_unit_of_measurement = VOLUME_FLOW_RATE_LITERS_PER_MINUTE
+        else:
+            self._attr_native_value = round(
+                self._fleet.flow_liters / LITERS_PER_GALLON, 2
+            )
+            self._attr_native_unit_of_measurement = VOLUME_FLOW_RATE_GALLONS_PER_MINUTE
+
+
+class IquaFleetMinSaltLevelSensor(IquaFleetSensor):
+    def update_from_fleet(self):
+        self._attr_native_value = self._fleet.min_salt_level
+
+
+class IquaFleetRegeneratedTodaySensor(IquaFleetSensor):
+    def update_from_fleet(self):
+        self._attr_native_value = self._fleet.regenerating
+
+
+class IquaFleetNeedingSaltSensor(IquaFleetSensor):
+    def update_from_fleet(self):
+        self._attr_native_value = self._fleet.needing_salt
 
 
 class IquaSoftenerSensor(SensorEntity, CoordinatorEntity, ABC):
     _attr_has_entity_name = True
     
+    # Only changes when the data turns stale or fresh; not worth recording
+    _unrecorded_attributes = frozenset({"stale"})
+    
     def __init__(
         self,
         coordinator: IquaSoftenerCoordinator,
@@ -180,26 +420,50 @@ class IquaSoftenerSensor(SensorEntity, CoordinatorEntity, ABC):
 
     @property
     def available(self) -> bool:
-        """Return if entity is available."""
-        return self.coordinator.last_update_success and self.coordinator.data is not None
+        """Return if entity is available, serving stale data within the window."""
+        if self.coordinator.data is None:
+            return False
+        return (
+            self.coordinator.last_update_success
+            or self.coordinator.within_stale_window
+        )
+
+    @property
+    def extra_state_attributes(self) -> Optional[Dict[str, Any]]:
+        """
+        Return whether the data is stale.
+
+        The data age is exposed by the last update sensor instead, since an
+        attribute changing on every write would churn state_changed events.
+        """
+        if self.coordinator.last_good_update is None:
+            return None
+        return {"stale": self.coordinator.is_stale}
 
     @abstractmethod
-    def update(self, data: IquaSoftenerData):
+    def update(self, data: IquaDeviceSnapshot):
         ...
 
 
 class IquaSoftenerStateSensor(IquaSoftenerSensor):
-    def update(self, data: IquaSoftenerData):
-        self._attr_native_value = str(data.state.value)
+    def update(self, data: IquaDeviceSnapshot):
+        self._attr_native_value = data.state
+
+
+class IquaSoftenerLastUpdateSensor(IquaSoftenerSensor):
+    """When the device data was last fetched successfully."""
+
+    def update(self, data: IquaDeviceSnapshot):
+        self._attr_native_value = self.coordinator.last_good_update
 
 
 class IquaSoftenerDeviceDateTimeSensor(IquaSoftenerSensor):
-    def update(self, data: IquaSoftenerData):
+    def update(self, data: IquaDeviceSnapshot):
         self._attr_native_value = data.device_date_time.strftime("%Y-%m-%d %H:%M:%S")
 
 
 class IquaSoftenerLastRegenerationSensor(IquaSoftenerSensor):
-    def update(self, data: IquaSoftenerData):
+    def update(self, data: IquaDeviceSnapshot):
         self._attr_native_value = (
             datetime.now(data.device_date_time.tzinfo)
             - timedelta(days=data.days_since_last_regeneration)
@@ -207,15 +471,55 @@ class IquaSoftenerLastRegenerationSensor(IquaSoftenerSensor):
 
 
 class IquaSoftenerOutOfSaltEstimatedDaySensor(IquaSoftenerSensor):
-    def update(self, data: IquaSoftenerData):
+    def update(self, data: IquaDeviceSnapshot):
         self._attr_native_value = (
             datetime.now(data.device_date_time.tzinfo)
             + timedelta(days=data.out_of_salt_estimated_days)
         ).replace(hour=0, minute=0, second=0)
 
 
+class IquaSoftenerSaltDepletionForecastSensor(IquaSoftenerSensor):
+    """Salt depletion estimated locally from the salt level history."""
+
+    _unrecorded_attributes = frozenset(
+        {"stale", "predicted_salt_level", "samples"}
+    )
+
+    def __init__(
+        self,
+        coordinator: IquaSoftenerCoordinator,
+        device_serial_number: str,
+        entity_description: SensorEntityDescription = None,
+    ):
+        self._forecast_attributes: Dict[str, Any] = {}
+        super().__init__(coordinator, device_serial_number, entity_description)
+
+    def update(self, data: IquaDeviceSnapshot):
+        forecast = self.coordinator.salt_forecast.forecast()
+        if forecast is None:
+            self._attr_native_value = None
+            self._forecast_attributes = {}
+            return
+        self._attr_native_value = forecast["depletion"]
+        self._forecast_attributes = {
+            "earliest": forecast["earliest"].isoformat()
+            if forecast["earliest"]
+            else None,
+            "latest": forecast["latest"].isoformat() if forecast["latest"] else None,
+            "predicted_salt_level": forecast["predicted_level"],
+            "salt_usage_per_day": forecast["usage_per_day"],
+            "salt_usage_per_regeneration": forecast["usage_per_regeneration"],
+            "samples": forecast["samples"],
+        }
+
+    @property
+    def extra_state_attributes(self) -> Optional[Dict[str, Any]]:
+        """Return the confidence interval and data freshness attributes."""
+        return {**self._forecast_attributes, **(super().extra_state_attributes or {})}
+
+
 class IquaSoftenerSaltLevelSensor(IquaSoftenerSensor):
-    def update(self, data: IquaSoftenerData):
+    def update(self, data: IquaDeviceSnapshot):
         self._attr_native_value = data.salt_level_percent
 
     @property
@@ -235,15 +539,15 @@ class IquaSoftenerSaltLevelSensor(IquaSoftenerSensor):
 
 
 class IquaSoftenerAvailableWaterSensor(IquaSoftenerSensor):
-    def update(self, data: IquaSoftenerData):
+    def update(self, data: IquaDeviceSnapshot):
         self._attr_native_value = data.total_water_available / (
             1000
-            if data.volume_unit == IquaSoftenerVolumeUnit.LITERS
+            if data.volume_unit == VOLUME_UNIT_LITERS
             else 1
         )
         self._attr_native_unit_of_measurement = (
             UnitOfVolume.CUBIC_METERS
-            if data.volume_unit == IquaSoftenerVolumeUnit.LITERS
+            if data.volume_unit == VOLUME_UNIT_LITERS
             else UnitOfVolume.GALLONS
         )
         self._attr_last_reset = datetime.now(data.device_date_time.tzinfo) - timedelta(
@@ -252,38 +556,187 @@ class IquaSoftenerAvailableWaterSensor(IquaSoftenerSensor):
 
 
 class IquaSoftenerWaterCurrentFlowSensor(IquaSoftenerSensor):
-    def update(self, data: IquaSoftenerData):
+    def update(self, data: IquaDeviceSnapshot):
         self._attr_native_value = data.current_water_flow
         self._attr_native_unit_of_measurement = (
             VOLUME_FLOW_RATE_LITERS_PER_MINUTE
-            if data.volume_unit == IquaSoftenerVolumeUnit.LITERS
+            if data.volume_unit == VOLUME_UNIT_LITERS
             else VOLUME_FLOW_RATE_GALLONS_PER_MINUTE
         )
 
 
+class IquaSoftenerContinuousFlowSensor(IquaSoftenerSensor):
+    """How long water has been flowing without a break, from the leak detector."""
+
+    _unrecorded_attributes = frozenset(
+        {"stale", "flow_started", "mean_flow", "flow_stddev", "low_steady_flow"}
+    )
+
+    def __init__(
+        self,
+        coordinator: IquaSoftenerCoordinator,
+        device_serial_number: str,
+        entity_description: SensorEntityDescription = None,
+    ):
+        self._leak_attributes: Dict[str, Any] = {}
+        super().__init__(coordinator, device_serial_number, entity_description)
+
+    def update(self, data: IquaDeviceSnapshot):
+        leak = self.coordinator.leak
+        self._attr_native_value = round(
+            leak.continuous_flow_duration.total_seconds() / 60
+        )
+        self._leak_attributes = {
+            "flow_started": leak.flow_started.isoformat()
+            if leak.flow_started
+            else None,
+            "mean_flow": round(leak.mean_flow, 2)
+            if leak.mean_flow is not None
+            else None,
+            "flow_stddev": round(leak.flow_stddev, 2)
+            if leak.flow_stddev is not None
+            else None,
+            "low_steady_flow": leak.low_steady_flow,
+        }
+
+    @property
+    def extra_state_attributes(self) -> Optional[Dict[str, Any]]:
+        """Return flow run statistics and data freshness attributes."""
+        return {**self._leak_attributes, **(super().extra_state_attributes or {})}
+
+
 class IquaSoftenerWaterUsageTodaySensor(IquaSoftenerSensor):
-    def update(self, data: IquaSoftenerData):
+    def update(self, data: IquaDeviceSnapshot):
         self._attr_native_value = data.today_use / (
             1000
-            if data.volume_unit == IquaSoftenerVolumeUnit.LITERS
+            if data.volume_unit == VOLUME_UNIT_LITERS
             else 1
         )
         self._attr_native_unit_of_measurement = (
             UnitOfVolume.CUBIC_METERS
-            if data.volume_unit == IquaSoftenerVolumeUnit.LITERS
+            if data.volume_unit == VOLUME_UNIT_LITERS
             else UnitOfVolume.GALLONS
         )
 
 
 class IquaSoftenerWaterUsageDailyAverageSensor(IquaSoftenerSensor):
-    def update(self, data: IquaSoftenerData):
+    def update(self, data: IquaDeviceSnapshot):
         self._attr_native_value = data.average_daily_use / (
             1000
-            if data.volume_unit == IquaSoftenerVolumeUnit.LITERS
+            if data.volume_unit == VOLUME_UNIT_LITERS
             else 1
         )
         self._attr_native_unit_of_measurement = (
             UnitOfVolume.CUBIC_METERS
-            if data.volume_unit == IquaSoftenerVolumeUnit.LITERS
+            if data.volume_unit == VOLUME_UNIT_LITERS
             else UnitOfVolume.GALLONS
         )
+
+
+class IquaSoftenerWaterUsagePeriodSensor(IquaSoftenerSensor, ABC):
+    """Usage over a calendar period, from the integration's aggregates."""
+
+    _period: str
+
+    def _to_display_unit(self, data: IquaDeviceSnapshot, liters: float) -> float:
+        """Convert liters to the unit the device currently reports in."""
+        if data.volume_unit == VOLUME_UNIT_LITERS:
+            self._attr_native_unit_of_measurement = UnitOfVolume.CUBIC_METERS
+            return round(liters / 1000, 3)
+        self._attr_native_unit_of_measurement = UnitOfVolume.GALLONS
+        return round(liters / LITERS_PER_GALLON, 1)
+
+
+class IquaSoftenerWaterUsageTotalSensor(IquaSoftenerWaterUsagePeriodSensor):
+    def update(self, data: IquaDeviceSnapshot):
+        totals = self.coordinator.aggregates.periods.get(self._period)
+        if totals is None:
+            return
+        self._attr_native_value = self._to_display_unit(data, totals.total)
+        self._attr_last_reset = datetime.combine(
+            totals.start, datetime.min.time(), data.device_date_time.tzinfo
+        )
+
+
+class IquaSoftenerWaterUsageAverageSensor(IquaSoftenerWaterUsagePeriodSensor):
+    def update(self, data: IquaDeviceSnapshot):
+        totals = self.coordinator.aggregates.periods.get(self._period)
+        if totals is None or totals.average is None:
+            return
+        self._attr_native_value = self._to_display_unit(data, totals.average)
+
+
+class IquaSoftenerWaterUsageWeekSensor(IquaSoftenerWaterUsageTotalSensor):
+    _period = "week"
+
+
+class IquaSoftenerWaterUsageMonthSensor(IquaSoftenerWaterUsageTotalSensor):
+    _period = "month"
+
+
+class IquaSoftenerWaterUsageWeeklyAverageSensor(IquaSoftenerWaterUsageAverageSensor):
+    _period = "week"
+
+
+class IquaSoftenerWaterUsageMonthlyAverageSensor(IquaSoftenerWaterUsageAverageSensor):
+    _period = "month"
+
+
+class IquaSoftenerSummarySensor(IquaSoftenerSensor):
+    """Device state carrying every reading as unrecorded attributes."""
+
+    _unrecorded_attributes = frozenset(
+        {
+            "stale",
+            "device_date_time",
+            "last_regeneration",
+            "out_of_salt_estimated_day",
+            "salt_level",
+            "available_water",
+            "water_current_flow",
+            "water_usage_today",
+            "water_usage_daily_average",
+            "volume_unit",
+            "flow_unit",
+        }
+    )
+
+    def __init__(
+        self,
+        coordinator: IquaSoftenerCoordinator,
+        device_serial_number: str,
+        entity_description: SensorEntityDescription = None,
+    ):
+        self._readings: Dict[str, Any] = {}
+        super().__init__(coordinator, device_serial_number, entity_description)
+
+    def update(self, data: IquaDeviceSnapshot):
+        liters = data.volume_unit == VOLUME_UNIT_LITERS
+        divisor = 1000 if liters else 1
+        now = datetime.now(data.device_date_time.tzinfo)
+        self._attr_native_value = data.state
+        self._readings = {
+            "device_date_time": data.device_date_time.isoformat(),
+            "last_regeneration": (
+                now - timedelta(days=data.days_since_last_regeneration)
+            ).replace(hour=0, minute=0, second=0).isoformat(),
+            "out_of_salt_estimated_day": (
+                now + timedelta(days=data.out_of_salt_estimated_days)
+            ).replace(hour=0, minute=0, second=0).isoformat(),
+            "salt_level": data.salt_level_percent,
+            "available_water": data.total_water_available / divisor,
+            "water_current_flow": data.current_water_flow,
+            "water_usage_today": data.today_use / divisor,
+            "water_usage_daily_average": data.average_daily_use / divisor,
+            "volume_unit": UnitOfVolume.CUBIC_METERS
+            if liters
+            else UnitOfVolume.GALLONS,
+            "flow_unit": VOLUME_FLOW_RATE_LITERS_PER_MINUTE
+            if liters
+            else VOLUME_FLOW_RATE_GALLONS_PER_MINUTE,
+        }
+
+    @property
+    def extra_state_attributes(self) -> Optional[Dict[str, Any]]:
+        """Return readings and data freshness attributes."""
+        return {**self._readings, **(super().extra_state_attributes or {})}
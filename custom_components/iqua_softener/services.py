@@ -0,0 +1,80 @@
+"""Services for iQua Softener."""
+from datetime import datetime
+from functools import partial
+import logging
+from typing import Optional
+
+import voluptuous as vol
+
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+import homeassistant.helpers.config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, CONF_DEVICE_SERIAL_NUMBER
+from .history import EXPORT_FORMAT_CSV, EXPORT_FORMAT_NDJSON, export_history
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_EXPORT_HISTORY = "export_history"
+
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_FORMAT = "format"
+ATTR_FILENAME = "filename"
+
+EXPORT_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_DEVICE_SERIAL_NUMBER): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+        vol.Optional(ATTR_FORMAT, default=EXPORT_FORMAT_CSV): vol.In(
+            [EXPORT_FORMAT_CSV, EXPORT_FORMAT_NDJSON]
+        ),
+        vol.Optional(ATTR_FILENAME): cv.string,
+    }
+)
+
+
+def _local(value: Optional[datetime]) -> Optional[datetime]:
+    """Read times without a zone as Home Assistant local time."""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+    return value
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration services."""
+
+    async def async_export_history(call: ServiceCall) -> ServiceResponse:
+        """Export recorded readings to a file in the config directory."""
+        export_format = call.data[ATTR_FORMAT]
+        filename = call.data.get(
+            ATTR_FILENAME,
+            f"history_{dt_util.now().strftime('%Y%m%d_%H%M%S')}.{export_format}",
+        )
+        return await hass.async_add_executor_job(
+            partial(
+                export_history,
+                hass,
+                filename,
+                export_format,
+                call.data.get(CONF_DEVICE_SERIAL_NUMBER),
+                _local(call.data.get(ATTR_START)),
+                _local(call.data.get(ATTR_END)),
+            )
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_HISTORY,
+        async_export_history,
+        schema=EXPORT_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
@@ -0,0 +1,138 @@
+"""Integration-owned thread pool for blocking EcoWater calls."""
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import threading
+from typing import Any, Callable, Dict
+
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant, callback
+
+from .const import DOMAIN, DATA_WORKER_POOL
+
+_LOGGER = logging.getLogger(__name__)
+
+# Concurrent blocking EcoWater calls by default
+MAX_WORKERS = 4
+# Threads the pool may grow to when the limit is raised
+MAX_POOL_SIZE = 16
+
+
+class IquaWorkerPool:
+    """
+    Size-limited thread pool for blocking API calls.
+
+    Keeps slow EcoWater requests off Home Assistant's shared executor and
+    tracks how many calls are queued and running. The concurrency limit can
+    be changed while calls are in flight.
+    """
+
+    def __init__(self, hass: HomeAssistant, max_workers: int = MAX_WORKERS) -> None:
+        """Initialize the pool."""
+        self.hass = hass
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=MAX_POOL_SIZE, thread_name_prefix="iqua_softener"
+        )
+        # Counters are updated from worker threads; waiting calls wait on it
+        self._cond = threading.Condition()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._peak_queue_depth = 0
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Return queue depth and throughput counters."""
+        with self._cond:
+            return {
+                "max_workers": self.max_workers,
+                "queued": self._queued,
+                "running": self._running,
+                "completed": self._completed,
+                "peak_queue_depth": self._peak_queue_depth,
+            }
+
+    @callback
+    def async_set_limit(self, max_workers: int) -> None:
+        """Change how many calls may run at once."""
+        max_workers = max(1, min(max_workers, MAX_POOL_SIZE))
+        with self._cond:
+            if max_workers == self.max_workers:
+                return
+            _LOGGER.debug(
+                "Worker pool limit changed from %d to %d", self.max_workers, max_workers
+            )
+            self.max_workers = max_workers
+            self._cond.notify_all()
+
+    async def async_run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking callable on the pool and return its result."""
+        with self._cond:
+            self._queued += 1
+            self._peak_queue_depth = max(self._peak_queue_depth, self._queued)
+            if self._queued > self.max_workers:
+                _LOGGER.debug("Worker pool backlog: %d call(s) queued", self._queued)
+        started = threading.Event()
+        try:
+            return await self.hass.loop.run_in_executor(
+                self._executor, self._run, started, func, args
+            )
+        finally:
+            with self._cond:
+                # Dropped from the queue without running (cancelled or shut down)
+                if not started.is_set():
+                    started.set()
+                    self._queued -= 1
+                    self._cond.notify_all()
+
+    def _run(
+        self, started: threading.Event, func: Callable[..., Any], args: tuple
+    ) -> Any:
+        """Run a call in a worker thread once a slot is free, keeping the counters."""
+        with self._cond:
+            self._cond.wait_for(
+                lambda: started.is_set() or self._running < self.max_workers
+            )
+            if started.is_set():
+                # The caller already gave up on this call
+                raise RuntimeError("Worker pool call cancelled before start")
+            started.set()
+            self._queued -= 1
+            self._running += 1
+        try:
+            return func(*args)
+        finally:
+            with self._cond:
+                self._running -= 1
+                self._completed += 1
+                self._cond.notify_all()
+
+    def shutdown(self) -> None:
+        """Cancel queued calls and stop accepting new ones without blocking."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+@callback
+def async_get_worker_pool(hass: HomeAssistant) -> IquaWorkerPool:
+    """Return the integration worker pool, creating it when needed."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_WORKER_POOL not in domain_data:
+        pool = domain_data[DATA_WORKER_POOL] = IquaWorkerPool(hass)
+
+        @callback
+        def _async_shutdown_on_close(event: Event) -> None:
+            if domain_data.get(DATA_WORKER_POOL) is pool:
+                async_shutdown_worker_pool(hass)
+
+        # After the stop event, so clients can still be closed on the pool
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_shutdown_on_close)
+    return domain_data[DATA_WORKER_POOL]
+
+
+@callback
+def async_shutdown_worker_pool(hass: HomeAssistant) -> None:
+    """Shut the worker pool down; the next call creates a new one."""
+    pool = hass.data.get(DOMAIN, {}).pop(DATA_WORKER_POOL, None)
+    if pool is not None:
+        _LOGGER.debug("Shutting down worker pool: %s", pool.stats)
+        pool.shutdown()
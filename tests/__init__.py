@@ -0,0 +1 @@
+"""Tests for the iQua Softener integration."""
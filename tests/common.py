@@ -0,0 +1,28 @@
+"""Helpers for iQua Softener tests."""
+from datetime import datetime, timezone
+from typing import Any
+
+from custom_components.iqua_softener.const import VOLUME_UNIT_LITERS
+from custom_components.iqua_softener.models import IquaDeviceSnapshot
+
+START = datetime(2026, 3, 2, 8, 0, tzinfo=timezone.utc)  # a Monday
+
+
+def make_snapshot(**values: Any) -> IquaDeviceSnapshot:
+    """Return a metric device snapshot, with the given fields overridden."""
+    return IquaDeviceSnapshot(
+        **{
+            "model": "Aquahome 20 (A1)",
+            "state": "Online",
+            "device_date_time": START,
+            "volume_unit": VOLUME_UNIT_LITERS,
+            "current_water_flow": 0.0,
+            "today_use": 0,
+            "average_daily_use": 300,
+            "total_water_available": 2000,
+            "days_since_last_regeneration": 1,
+            "salt_level_percent": 80,
+            "out_of_salt_estimated_days": 60,
+            **values,
+        }
+    )
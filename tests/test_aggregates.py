@@ -0,0 +1,127 @@
+"""Tests for the iQua Softener usage aggregates."""
+from datetime import timedelta
+
+import pytest
+
+from custom_components.iqua_softener.aggregates import (
+    LITERS_PER_GALLON,
+    IquaUsageAggregator,
+)
+
+from .common import START, make_snapshot
+
+SERIAL = "DSN1234567890"
+
+
+def _reading(aggregator, days, today_use, **values):
+    """Fold in a reading taken `days` after the start (a Monday)."""
+    aggregator.async_process(
+        make_snapshot(
+            device_date_time=START + timedelta(days=days),
+            today_use=today_use,
+            **values,
+        )
+    )
+
+
+async def test_usage_accumulates_within_a_day(hass):
+    """Readings during the day add only their growth."""
+    aggregator = IquaUsageAggregator(hass, SERIAL)
+    _reading(aggregator, 0, 40)
+    _reading(aggregator, 0.1, 100)
+    _reading(aggregator, 0.2, 100)
+
+    for totals in aggregator.periods.values():
+        assert totals.total == 100
+        assert totals.average is None
+
+
+async def test_periods_roll_over(hass):
+    """Days, weeks and months close with their totals and averages."""
+    aggregator = IquaUsageAggregator(hass, SERIAL)
+    # Monday 2 March until Wednesday 1 April, 100 L a day
+    for day in range(31):
+        _reading(aggregator, day, 100)
+
+    day = aggregator.periods["day"]
+    assert day.total == 100
+    assert day.completed == 30
+    assert day.previous_total == 100
+    assert day.average == 100
+
+    week = aggregator.periods["week"]
+    assert week.start.isoformat() == "2026-03-30"
+    assert week.total == 300
+    assert week.completed == 4
+    assert week.average == 700
+
+    month = aggregator.periods["month"]
+    assert month.start.isoformat() == "2026-04-01"
+    assert month.total == 100
+    assert month.previous_total == 3000
+
+
+async def test_midnight_reset_counts_new_usage(hass):
+    """A lower reading is usage since the device's midnight reset."""
+    aggregator = IquaUsageAggregator(hass, SERIAL)
+    _reading(aggregator, 0, 300)
+    # Late poll: the counter reset and grew before the date changed
+    _reading(aggregator, 0.1, 20)
+
+    assert aggregator.periods["week"].total == 320
+
+
+async def test_unit_change_is_converted(hass):
+    """Totals stay in liters when the device switches to gallons."""
+    aggregator = IquaUsageAggregator(hass, SERIAL)
+    _reading(aggregator, 0, 0, volume_unit=0)
+    _reading(aggregator, 0.1, 10, volume_unit=0)
+    assert aggregator.periods["day"].total == pytest.approx(10 * LITERS_PER_GALLON)
+
+    # Same usage read in liters after the switch is not counted again
+    _reading(aggregator, 0.2, 37)
+    assert aggregator.periods["day"].total == pytest.approx(10 * LITERS_PER_GALLON)
+
+
+async def test_totals_survive_a_restart(hass):
+    """Saved totals are restored by a new aggregator."""
+    aggregator = IquaUsageAggregator(hass, SERIAL)
+    _reading(aggregator, 0, 100)
+    _reading(aggregator, 1, 50)
+    await aggregator.async_save()
+
+    restored = IquaUsageAggregator(hass, SERIAL)
+    await restored.async_load()
+    _reading(restored, 1.1, 80)
+
+    assert restored.periods["day"].previous_total == 100
+    assert restored.periods["week"].total == 180
+
+
+async def test_missed_days_are_left_out_of_averages(hass):
+    """Periods with days that were not recorded do not count as completed."""
+    aggregator = IquaUsageAggregator(hass, SERIAL)
+    # Monday to Wednesday, then down until the Saturday; then a full week
+    for day in [0, 1, 2, 5, 6] + list(range(7, 15)):
+        _reading(aggregator, day, 100 if day < 7 else 50)
+
+    day = aggregator.periods["day"]
+    # Wednesday ended during the outage, so only the other days count
+    assert day.completed == 11
+    assert day.average == pytest.approx(750 / 11)
+
+    week = aggregator.periods["week"]
+    assert week.completed == 1
+    assert week.average == 350
+    assert week.previous_total == 350
+
+
+async def test_skipped_period_clears_previous_total(hass):
+    """The closed total is not shown as the previous period's after a gap."""
+    aggregator = IquaUsageAggregator(hass, SERIAL)
+    _reading(aggregator, 0, 100)
+    _reading(aggregator, 3, 100)
+
+    day = aggregator.periods["day"]
+    assert day.previous_total is None
+    assert day.completed == 0
@@ -0,0 +1,43 @@
+"""Tests for the iQua Softener client registry."""
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+
+from custom_components.iqua_softener.api import IquaApiClient
+from custom_components.iqua_softener.clients import async_get_client_registry
+
+USERNAME = "User@example.com"
+
+
+async def test_new_password_is_swapped_in_place(hass):
+    """Entries holding the account client see new credentials."""
+    registry = async_get_client_registry(hass)
+    client = await registry.async_get_client(USERNAME, "old")
+    client.auth_failed = True
+
+    assert await registry.async_get_client(USERNAME.lower(), "new") is client
+    assert client.password == "new"
+    assert not client.auth_failed
+
+
+async def test_signed_in_client_is_taken_over(hass):
+    """The registered client adopts the token of a validated client."""
+    registry = async_get_client_registry(hass)
+    client = await registry.async_get_client(USERNAME, "old")
+    validated = IquaApiClient(USERNAME, "new")
+    validated.restore_token({"token": "abc", "token_type": "Bearer", "expires": None})
+
+    assert await registry.async_get_client(USERNAME, "new", validated) is client
+    assert client.password == "new"
+    assert client.export_token()["token"] == "abc"
+
+
+async def test_clients_closed_on_stop(hass):
+    """Sessions are closed when Home Assistant stops."""
+    registry = async_get_client_registry(hass)
+    client = await registry.async_get_client(USERNAME, "secret")
+    client._get_session()
+
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STOP)
+    await hass.async_block_till_done()
+
+    assert client._session is None
+    assert await registry.async_get_client(USERNAME, "secret") is not client
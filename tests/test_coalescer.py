@@ -0,0 +1,86 @@
+"""Tests for the iQua Softener request coalescer."""
+import asyncio
+import threading
+
+import pytest
+
+from custom_components.iqua_softener.coalescer import IquaRequestCoalescer
+
+ACCOUNT = "User@example.com"
+SERIAL = "DSN1234567890"
+
+
+class BlockingFetch:
+    """Blocking fetch that waits for the test to release it."""
+
+    def __init__(self, result="data"):
+        self.result = result
+        self.calls = 0
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        assert self.release.wait(5)
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+async def test_concurrent_callers_share_one_fetch(hass):
+    """Callers arriving while a fetch runs get its result."""
+    coalescer = IquaRequestCoalescer(hass)
+    fetch = BlockingFetch()
+
+    first = hass.async_create_task(coalescer.async_fetch(ACCOUNT, SERIAL, fetch))
+    second = hass.async_create_task(
+        coalescer.async_fetch(ACCOUNT.lower(), SERIAL, fetch)
+    )
+    await asyncio.sleep(0)
+    fetch.release.set()
+
+    assert await asyncio.gather(first, second) == ["data", "data"]
+    assert fetch.calls == 1
+
+
+async def test_results_are_cached(hass):
+    """A fresh result is served until invalidated."""
+    coalescer = IquaRequestCoalescer(hass)
+    fetch = BlockingFetch()
+    fetch.release.set()
+
+    await coalescer.async_fetch(ACCOUNT, SERIAL, fetch)
+    await coalescer.async_fetch(ACCOUNT, SERIAL, fetch)
+    assert fetch.calls == 1
+
+    coalescer.async_invalidate(ACCOUNT, SERIAL)
+    await coalescer.async_fetch(ACCOUNT, SERIAL, fetch)
+    assert fetch.calls == 2
+
+
+async def test_cancelled_caller_leaves_request_running(hass):
+    """Cancelling one waiter does not fail the others."""
+    coalescer = IquaRequestCoalescer(hass)
+    fetch = BlockingFetch()
+
+    first = hass.async_create_task(coalescer.async_fetch(ACCOUNT, SERIAL, fetch))
+    second = hass.async_create_task(coalescer.async_fetch(ACCOUNT, SERIAL, fetch))
+    await asyncio.sleep(0)
+    first.cancel()
+    fetch.release.set()
+
+    assert await second == "data"
+    assert first.cancelled()
+
+
+async def test_failures_are_not_cached(hass):
+    """The next caller retries after a failed fetch."""
+    coalescer = IquaRequestCoalescer(hass)
+    fetch = BlockingFetch(ValueError("boom"))
+    fetch.release.set()
+
+    with pytest.raises(ValueError):
+        await coalescer.async_fetch(ACCOUNT, SERIAL, fetch)
+
+    fetch.result = "data"
+    assert await coalescer.async_fetch(ACCOUNT, SERIAL, fetch) == "data"
+    assert fetch.calls == 2
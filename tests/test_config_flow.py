@@ -0,0 +1,37 @@
+"""Tests for the iQua Softener config flow."""
+import pytest
+
+from homeassistant import config_entries
+from homeassistant.data_entry_flow import FlowResultType
+
+from custom_components.iqua_softener.api import API_BASE_URL
+from custom_components.iqua_softener.const import CONF_PASSWORD, CONF_USERNAME, DOMAIN
+
+USER_INPUT = {CONF_USERNAME: "user@example.com", CONF_PASSWORD: "wrong"}
+
+
+@pytest.mark.parametrize(
+    ("signin", "error"),
+    [
+        ({"status_code": 401, "text": "Unauthorized"}, "invalid_auth"),
+        ({"json": {"code": "ERROR", "message": "Invalid user"}}, "invalid_auth"),
+        ({"status_code": 502}, "server_unavailable"),
+        ({"status_code": 500}, "cannot_connect"),
+    ],
+)
+async def test_hub_signin_errors(hass, requests_mock, signin, error):
+    """Rejected credentials are told apart from server errors by type."""
+    requests_mock.post(f"{API_BASE_URL}/auth/signin", **signin)
+
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {"next_step_id": "hub"}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], USER_INPUT
+    )
+
+    assert result["type"] == FlowResultType.FORM
+    assert result["errors"] == {"base": error}
@@ -0,0 +1,34 @@
+"""Tests for iQua Softener diagnostics."""
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.iqua_softener.const import (
+    CONF_IS_HUB,
+    CONF_PASSWORD,
+    CONF_USERNAME,
+    DATA_WORKER_POOL,
+    DOMAIN,
+)
+from custom_components.iqua_softener.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from custom_components.iqua_softener.models import IquaDeviceRegistry
+
+
+class FakeHub:
+    """Hub with an empty device list."""
+
+    devices = IquaDeviceRegistry()
+
+
+async def test_diagnostics_do_not_create_worker_pool(hass):
+    """Diagnostics read the worker pool only if one is running."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_IS_HUB: True, CONF_USERNAME: "user@example.com", CONF_PASSWORD: "x"},
+    )
+    hass.data[DOMAIN] = {entry.entry_id: {"hub": FakeHub()}}
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+
+    assert diagnostics["worker_pool"] is None
+    assert DATA_WORKER_POOL not in hass.data[DOMAIN]
@@ -0,0 +1,101 @@
+"""Tests for the iQua Softener salt depletion forecast."""
+from datetime import timedelta
+
+import pytest
+
+from custom_components.iqua_softener.forecast import IquaSaltForecaster
+
+from .common import START, make_snapshot
+
+SERIAL = "DSN1234567890"
+
+
+def _samples(forecaster, levels, first_day=0, days_since_regen=None):
+    """Fold in one daily salt level sample per level."""
+    for index, level in enumerate(levels):
+        forecaster.async_process(
+            make_snapshot(
+                salt_level_percent=level,
+                days_since_last_regeneration=(
+                    days_since_regen[index] if days_since_regen else 1
+                ),
+            ),
+            START + timedelta(days=first_day + index),
+        )
+
+
+async def test_no_forecast_without_enough_samples(hass):
+    """Two samples are not enough for a forecast."""
+    forecaster = IquaSaltForecaster(hass, SERIAL)
+    _samples(forecaster, [80, 78])
+
+    assert forecaster.forecast() is None
+
+
+async def test_no_forecast_without_salt_use(hass):
+    """A level that does not drop never runs out."""
+    forecaster = IquaSaltForecaster(hass, SERIAL)
+    _samples(forecaster, [80, 80, 81, 80])
+
+    assert forecaster.forecast() is None
+
+
+async def test_declining_level_forecasts_depletion(hass):
+    """A steady decline reaches 0% where the line does."""
+    forecaster = IquaSaltForecaster(hass, SERIAL)
+    _samples(forecaster, [80, 78, 76, 74, 72])
+
+    forecast = forecaster.forecast()
+    assert forecast["usage_per_day"] == 2
+    assert forecast["depletion"] == START + timedelta(days=40)
+    # A perfect fit has no uncertainty
+    assert forecast["earliest"] == forecast["latest"] == forecast["depletion"]
+    assert forecast["samples"] == 5
+
+
+async def test_noisy_level_has_an_interval(hass):
+    """Scatter around the trend widens the depletion interval."""
+    forecaster = IquaSaltForecaster(hass, SERIAL)
+    _samples(forecaster, [80, 79, 76, 75, 71, 71, 68])
+
+    forecast = forecaster.forecast()
+    assert forecast["earliest"] < forecast["depletion"] < forecast["latest"]
+
+
+async def test_refill_starts_a_new_fit(hass):
+    """A rise in the salt level discards samples from before the refill."""
+    forecaster = IquaSaltForecaster(hass, SERIAL)
+    _samples(forecaster, [30, 20, 10])
+    _samples(forecaster, [90, 89, 88], first_day=3)
+
+    forecast = forecaster.forecast()
+    assert forecast["samples"] == 3
+    assert forecast["usage_per_day"] == 1
+    assert forecast["depletion"] == START + timedelta(days=93)
+
+
+async def test_salt_use_per_regeneration(hass):
+    """Salt used since the refill is spread over counted regenerations."""
+    forecaster = IquaSaltForecaster(hass, SERIAL)
+    _samples(forecaster, [80, 76, 72, 68], days_since_regen=[1, 0, 1, 0])
+
+    assert forecaster.regenerations == 2
+    assert forecaster.forecast()["usage_per_regeneration"] == pytest.approx(6)
+
+
+async def test_polls_sample_at_most_daily(hass):
+    """Repeated readings between daily samples do not narrow the interval."""
+    forecaster = IquaSaltForecaster(hass, SERIAL)
+    poll = timedelta(minutes=5)
+    for index in range(2 * 288 + 1):
+        forecaster.async_process(
+            make_snapshot(salt_level_percent=80 - index // 288), START + index * poll
+        )
+
+    assert forecaster.forecast()["samples"] == 3
+
+    # A refill starts a new fit straight away
+    forecaster.async_process(
+        make_snapshot(salt_level_percent=95), START + timedelta(days=2, hours=1)
+    )
+    assert forecaster.forecast() is None
@@ -0,0 +1,54 @@
+"""Tests for the iQua Softener hub."""
+import time
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.iqua_softener.hub import LISTING_TTL, IquaHub
+from custom_components.iqua_softener.models import IquaDeviceRecord
+
+from .common import make_snapshot
+
+USERNAME = "user@example.com"
+SERIALS = ["DSN0000000001", "DSN0000000002"]
+
+
+def make_client() -> MagicMock:
+    """Return an account client listing two devices."""
+    client = MagicMock()
+    client.username = USERNAME
+    client.list_devices.return_value = [
+        IquaDeviceRecord(serial=serial) for serial in SERIALS
+    ]
+    client.get_device_snapshot.return_value = make_snapshot()
+    return client
+
+
+async def test_unused_prefetched_data_expires(hass):
+    """Data prefetched for a device without an entry is dropped after max_age."""
+    hub = IquaHub(hass, USERNAME, "secret", make_client())
+    await hub.async_setup()
+    await hub.async_prefetch(timedelta(minutes=15))
+
+    assert hub.pop_prefetched(SERIALS[0]) is not None
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(minutes=16))
+    await hass.async_block_till_done()
+
+    assert hub.pop_prefetched(SERIALS[1]) is None
+
+
+async def test_reload_reuses_only_a_recent_listing(hass, monkeypatch):
+    """A listing older than LISTING_TTL is fetched again on setup."""
+    client = make_client()
+    await IquaHub(hass, USERNAME, "secret", client).async_setup()
+
+    await IquaHub(hass, USERNAME, "secret", client).async_setup()
+    assert client.list_devices.call_count == 1
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + LISTING_TTL)
+    await IquaHub(hass, USERNAME, "secret", client).async_setup()
+    assert client.list_devices.call_count == 2
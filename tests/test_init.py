@@ -0,0 +1,57 @@
+"""Tests for iQua Softener entry setup and updates."""
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.config_entries import ConfigEntryState
+
+from custom_components.iqua_softener.api import API_BASE_URL
+from custom_components.iqua_softener.clients import async_get_client_registry
+from custom_components.iqua_softener.const import (
+    CONF_DEVICE_SERIAL_NUMBER,
+    CONF_IS_HUB,
+    CONF_PASSWORD,
+    CONF_USERNAME,
+    DOMAIN,
+)
+
+from .test_models import load_fixture
+
+USERNAME = "user@example.com"
+
+
+async def test_standalone_entry_reloads_for_new_password(hass, requests_mock):
+    """
+    A standalone entry reloads for its new password.
+
+    Another entry of the account may already have applied it to the shared
+    client, e.g. after reauthentication.
+    """
+    payload = load_fixture("dashboard_metric.json")
+    serial = payload["data"]["serialNumber"]
+    requests_mock.post(f"{API_BASE_URL}/auth/signin", json=load_fixture("signin.json"))
+    requests_mock.get(f"{API_BASE_URL}/system/{serial}/dashboard", json=payload)
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=2,
+        unique_id=serial.lower(),
+        data={
+            CONF_IS_HUB: False,
+            CONF_USERNAME: USERNAME,
+            CONF_PASSWORD: "old",
+            CONF_DEVICE_SERIAL_NUMBER: serial,
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+    await async_get_client_registry(hass).async_get_client(USERNAME, "new")
+    hass.config_entries.async_update_entry(
+        entry, data={**entry.data, CONF_PASSWORD: "new"}
+    )
+    await hass.async_block_till_done()
+
+    assert entry.state is ConfigEntryState.LOADED
+    assert hass.data[DOMAIN][entry.entry_id]["coordinator"] is not coordinator
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
@@ -0,0 +1,42 @@
+"""Loading the config flow does not pull in runtime code."""
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded only once an entry is set up or credentials are validated;
+# requests is not listed as Home Assistant itself already imports it
+RUNTIME_MODULES = [
+    "iqua_softener",
+    "custom_components.iqua_softener.api",
+    "custom_components.iqua_softener.clients",
+    "custom_components.iqua_softener.coalescer",
+    "custom_components.iqua_softener.coordinator",
+    "custom_components.iqua_softener.fleet",
+    "custom_components.iqua_softener.hub",
+    "custom_components.iqua_softener.models",
+    "custom_components.iqua_softener.worker_pool",
+]
+
+LOADED = """
+import json, sys
+import custom_components.iqua_softener.config_flow
+print(json.dumps(sorted(sys.modules)))
+"""
+
+
+def test_config_flow_does_not_import_runtime_modules():
+    """Importing the config flow in a fresh interpreter leaves them unloaded."""
+    result = subprocess.run(
+        [sys.executable, "-c", LOADED],
+        capture_output=True,
+        check=True,
+        cwd=ROOT,
+        text=True,
+    )
+    loaded = set(json.loads(result.stdout.splitlines()[-1]))
+
+    assert "custom_components.iqua_softener.config_flow" in loaded
+    assert [module for module in RUNTIME_MODULES if module in loaded] == []
@@ -0,0 +1,98 @@
+"""Tests for the iQua Softener leak detector."""
+from datetime import timedelta
+
+from custom_components.iqua_softener.leak import IquaLeakDetector
+
+from .common import START, make_snapshot
+
+POLL = timedelta(minutes=5)
+LEAK_DURATION = timedelta(hours=4)
+# volumeUnitEnum value for devices reporting gallons
+VOLUME_UNIT_GALLONS = 0
+
+
+def _run(detector, flows, today_use=0, step=0, **values):
+    """Feed one poll per flow rate, growing today's usage by `step` each poll."""
+    for index, flow in enumerate(flows):
+        detector.async_process(
+            make_snapshot(
+                current_water_flow=flow, today_use=today_use + index * step, **values
+            ),
+            START + index * POLL,
+        )
+
+
+def test_steady_low_flow_is_suspected():
+    """A low, steady flow is a leak once it has lasted the leak duration."""
+    detector = IquaLeakDetector(LEAK_DURATION)
+    polls = LEAK_DURATION // POLL
+
+    _run(detector, [0.5] * polls, step=2)
+    assert not detector.leak_suspected
+
+    _run(detector, [0.5] * (polls + 1), step=2)
+    assert detector.continuous_flow_duration == LEAK_DURATION
+    assert detector.mean_flow == 0.5
+    assert detector.flow_stddev == 0
+    assert detector.leak_suspected
+
+
+def test_high_flow_is_not_suspected():
+    """Long regular use such as irrigation is not a leak."""
+    detector = IquaLeakDetector(LEAK_DURATION)
+
+    _run(detector, [10.0] * 60, step=50)
+
+    assert detector.continuous_flow_duration > LEAK_DURATION
+    assert not detector.low_steady_flow
+    assert not detector.leak_suspected
+
+
+def test_irregular_flow_is_not_suspected():
+    """Taps switching on and off vary the flow too much for a leak."""
+    detector = IquaLeakDetector(LEAK_DURATION)
+
+    _run(detector, [0.2, 1.9] * 30, step=5)
+
+    assert not detector.leak_suspected
+
+
+def test_shower_during_leak_is_forgotten():
+    """One burst of usage does not hide a leak for the rest of the run."""
+    detector = IquaLeakDetector(LEAK_DURATION)
+
+    _run(detector, [0.5] * 10 + [8.0] + [0.5] * 40, step=2)
+
+    assert detector.leak_suspected
+
+
+def test_gallon_devices_use_a_converted_threshold():
+    """The low flow limit is converted for devices reporting gallons."""
+    detector = IquaLeakDetector(LEAK_DURATION)
+
+    _run(detector, [1.5] * 60, step=1, volume_unit=VOLUME_UNIT_GALLONS)
+
+    assert not detector.leak_suspected
+
+
+def test_zero_flow_keeps_run_while_usage_grows():
+    """A poll between samples of flow does not end the run if usage grew."""
+    detector = IquaLeakDetector(LEAK_DURATION)
+
+    _run(detector, [0.5, 0.0, 0.5], step=2)
+    assert detector.continuous_flow_duration == 2 * POLL
+
+    detector.async_process(make_snapshot(today_use=4), START + 3 * POLL)
+    assert detector.flow_started is None
+    assert detector.mean_flow is None
+    assert detector.continuous_flow_duration == timedelta()
+
+
+def test_midnight_reset_is_not_usage():
+    """The device's midnight reset of today's usage does not start a run."""
+    detector = IquaLeakDetector(LEAK_DURATION)
+
+    detector.async_process(make_snapshot(today_use=500), START)
+    detector.async_process(make_snapshot(today_use=0), START + POLL)
+
+    assert detector.flow_started is None
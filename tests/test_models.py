@@ -0,0 +1,113 @@
+"""Tests for the iQua Softener data models."""
+import dataclasses
+import json
+import os
+
+import pytest
+
+from iqua_softener import IquaSoftener
+
+from custom_components.iqua_softener.api import API_BASE_URL, IquaApiClient
+from custom_components.iqua_softener.models import (
+    IquaDeviceRecord,
+    IquaDeviceRegistry,
+    IquaDeviceSnapshot,
+)
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def load_fixture(name: str) -> dict:
+    """Return a JSON fixture."""
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as file:
+        return json.load(file)
+
+
+@pytest.fixture(params=["dashboard_metric.json", "dashboard_us.json"])
+def dashboard(request, requests_mock):
+    """Serve a recorded dashboard payload from a mocked EcoWater API."""
+    payload = load_fixture(request.param)
+    serial = payload["data"]["serialNumber"]
+    requests_mock.post(f"{API_BASE_URL}/auth/signin", json=load_fixture("signin.json"))
+    requests_mock.get(f"{API_BASE_URL}/system/{serial}/dashboard", json=payload)
+    return serial, payload
+
+
+def test_snapshot_matches_library(dashboard):
+    """The lean parser gives the same values as iqua_softener's get_data()."""
+    serial, payload = dashboard
+    expected = IquaSoftener("user@example.com", "secret", serial).get_data()
+    snapshot = IquaDeviceSnapshot.from_dashboard(payload["data"])
+
+    for field in dataclasses.fields(IquaDeviceSnapshot):
+        value = getattr(snapshot, field.name)
+        library_value = getattr(expected, field.name)
+        if field.name == "state":
+            # The library wraps it in an str enum
+            library_value = library_value.value
+        assert value == library_value, field.name
+        if field.name != "volume_unit":
+            # Same types as well, e.g. float flow and int counters
+            assert type(value) is type(library_value), field.name
+    assert snapshot.device_date_time.tzinfo == expected.device_date_time.tzinfo
+
+
+def test_client_snapshot_matches_parser(dashboard):
+    """The API client fetches and parses the dashboard into the same snapshot."""
+    serial, payload = dashboard
+    client = IquaApiClient("user@example.com", "secret")
+    try:
+        assert client.get_device_snapshot(serial) == IquaDeviceSnapshot.from_dashboard(
+            payload["data"]
+        )
+    finally:
+        client.close()
+
+
+def test_snapshot_is_immutable():
+    """Snapshots can be shared between consumers without copying."""
+    snapshot = IquaDeviceSnapshot.from_dashboard(
+        load_fixture("dashboard_metric.json")["data"]
+    )
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        snapshot.today_use = 0
+
+
+def test_device_registry_indexes():
+    """Records are found by serial, system type and model."""
+    devices = IquaDeviceRegistry()
+    devices.upsert(IquaDeviceRecord("A1", model="Softener", system_type="demand"))
+    devices.upsert(IquaDeviceRecord("B2", model="Filter", system_type="demand"))
+
+    assert "A1" in devices
+    assert len(devices) == 2
+    assert sorted(record.serial for record in devices.by_system_type("demand")) == [
+        "A1",
+        "B2",
+    ]
+    assert [record.serial for record in devices.by_model("Filter")] == ["B2"]
+
+
+def test_device_registry_merges_partial_records():
+    """Upserting a partial record keeps known fields and reindexes changed ones."""
+    devices = IquaDeviceRegistry()
+    devices.upsert(IquaDeviceRecord("A1", nickname="Kitchen", model="Softener"))
+    record = devices.upsert(IquaDeviceRecord("A1", model="Softener Pro", state="Online"))
+
+    assert record is devices.get("A1")
+    assert record.nickname == "Kitchen"
+    assert record.state == "Online"
+    assert devices.by_model("Softener") == []
+    assert devices.by_model("Softener Pro") == [record]
+
+
+def test_device_registry_remove():
+    """Removed records leave no index entries behind."""
+    devices = IquaDeviceRegistry()
+    devices.upsert(IquaDeviceRecord("A1", model="Softener", system_type="demand"))
+
+    assert devices.remove("A1").serial == "A1"
+    assert devices.remove("A1") is None
+    assert "A1" not in devices
+    assert devices.by_model("Softener") == []
+    assert devices.by_system_type("demand") == []
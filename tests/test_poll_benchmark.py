@@ -0,0 +1,73 @@
+"""CPU per poll before and after the integration's own response decoding."""
+import json
+import os
+import time
+from typing import Callable, Dict
+
+from homeassistant.util.json import json_loads
+
+from iqua_softener import IquaSoftener
+
+from custom_components.iqua_softener.api import API_BASE_URL, IquaApiClient
+from custom_components.iqua_softener.models import IquaDeviceSnapshot
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+# Calls timed per round; the best round of each path is reported
+CALLS = 200
+ROUNDS = 5
+
+
+def _best_cpu(paths: Dict[str, Callable[[], object]]) -> Dict[str, float]:
+    """Return each path's best process time per call in ms, rounds interleaved."""
+    best = {}
+    for call in paths.values():
+        call()  # Sign in and warm up
+    for _ in range(ROUNDS):
+        for name, call in paths.items():
+            start = time.process_time()
+            for _ in range(CALLS):
+                call()
+            elapsed = (time.process_time() - start) / CALLS * 1000
+            best[name] = min(best.get(name, elapsed), elapsed)
+    return best
+
+
+def test_cpu_per_poll(requests_mock):
+    """Report CPU per poll with iqua_softener's get_data() and with the client."""
+    with open(os.path.join(FIXTURES, "dashboard_metric.json"), "rb") as file:
+        body = file.read()
+    with open(os.path.join(FIXTURES, "signin.json"), encoding="utf-8") as file:
+        signin = json.load(file)
+    serial = json.loads(body)["data"]["serialNumber"]
+    requests_mock.post(f"{API_BASE_URL}/auth/signin", json=signin)
+    requests_mock.get(f"{API_BASE_URL}/system/{serial}/dashboard", content=body)
+
+    library = IquaSoftener("user@example.com", "secret", serial)
+    client = IquaApiClient("user@example.com", "secret")
+    try:
+        cpu = _best_cpu(
+            {
+                # requests' .json() is the standard library decoder
+                "decode_before": lambda: json.loads(body),
+                "decode_after": lambda: IquaDeviceSnapshot.from_dashboard(
+                    json_loads(body)["data"]
+                ),
+                # Whole polls over a mocked transport
+                "poll_before": library.get_data,
+                "poll_after": lambda: client.get_device_snapshot(serial),
+            }
+        )
+        snapshot = client.get_device_snapshot(serial)
+        expected = library.get_data()
+    finally:
+        client.close()
+
+    print(
+        "\nCPU per poll (ms): "
+        + ", ".join(f"{name} {value:.3f}" for name, value in cpu.items())
+    )
+    # Timings are reported rather than asserted, as they vary with machine
+    # load; both paths must read the same values
+    assert snapshot.today_use == expected.today_use
+    assert snapshot.salt_level_percent == expected.salt_level_percent
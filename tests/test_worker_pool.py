@@ -0,0 +1,91 @@
+"""Tests for the iQua Softener worker pool."""
+import asyncio
+import threading
+
+from custom_components.iqua_softener.worker_pool import (
+    MAX_POOL_SIZE,
+    IquaWorkerPool,
+)
+
+
+class Probe:
+    """Blocking call recording how many copies run at once."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self._lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+
+    def __call__(self):
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            assert self.release.wait(5)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+
+async def _wait_for(condition):
+    """Wait for worker threads to reach a state."""
+    for _ in range(500):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not reached")
+
+
+async def test_limit_caps_concurrency(hass):
+    """No more calls run at once than the limit allows."""
+    pool = IquaWorkerPool(hass, max_workers=2)
+    probe = Probe()
+
+    calls = [hass.async_create_task(pool.async_run(probe)) for _ in range(5)]
+    await _wait_for(lambda: pool.stats["running"] == 2)
+    assert pool.stats["queued"] == 3
+
+    probe.release.set()
+    await asyncio.gather(*calls)
+    pool.shutdown()
+
+    stats = pool.stats
+    assert probe.peak == 2
+    assert (stats["queued"], stats["running"], stats["completed"]) == (0, 0, 5)
+    assert stats["peak_queue_depth"] >= 3
+
+
+async def test_raising_limit_starts_queued_calls(hass):
+    """Queued calls start when the limit is raised while they wait."""
+    pool = IquaWorkerPool(hass, max_workers=1)
+    probe = Probe()
+
+    calls = [hass.async_create_task(pool.async_run(probe)) for _ in range(3)]
+    await _wait_for(lambda: pool.stats["running"] == 1)
+
+    pool.async_set_limit(3)
+    await _wait_for(lambda: pool.stats["running"] == 3)
+
+    probe.release.set()
+    await asyncio.gather(*calls)
+    pool.shutdown()
+
+
+async def test_limit_is_clamped(hass):
+    """The limit stays between one and the pool size."""
+    pool = IquaWorkerPool(hass)
+
+    pool.async_set_limit(0)
+    assert pool.max_workers == 1
+    pool.async_set_limit(MAX_POOL_SIZE + 10)
+    assert pool.max_workers == MAX_POOL_SIZE
+    pool.shutdown()
+
+
+async def test_run_returns_result(hass):
+    """Arguments are passed through and the result returned."""
+    pool = IquaWorkerPool(hass)
+
+    assert await pool.async_run(max, 3, 7) == 7
+    pool.shutdown()